@@ -0,0 +1,330 @@
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from zh_mistake_text_gen import Pipeline, analysis, utils
+from zh_mistake_text_gen.data_maker import default_maker_classes
+from zh_mistake_text_gen.exception import NoCandidateError, ZeorSearchResultsError
+from zh_mistake_text_gen.sampling import use_rng
+
+corpus_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'corpus.txt')
+
+# 與 `Pipeline._try_maker` 相同的重試上限
+MAX_RETRY = 5
+
+# cold: 每個樣本前清空斷詞與發音查詢快取，對應句子不重複的語料；warm: 快取已涵蓋整份語料
+CACHE_MODES = ('cold', 'warm')
+
+
+def load_corpus(path=corpus_path):
+    """
+    讀取基準測試語料，一行一句
+    """
+    with open(path, encoding='utf-8') as f:
+        return [line.rstrip('\n') for line in f if line.strip() != '']
+
+
+def percentile(sorted_values, q):
+    if len(sorted_values) == 0:
+        return None
+    index = min(len(sorted_values) - 1, int(round(q / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def summarize(latencies_ns, elapsed, attempts, failures):
+    """
+    彙整一組量測結果
+
+    :param latencies_ns: 每個樣本的延遲（奈秒）
+    :param elapsed: 總耗時（秒）
+    :param attempts: 總嘗試次數（含重試）
+    :param failures: 失敗的樣本數
+    """
+    n = len(latencies_ns)
+    latencies_ns = sorted(latencies_ns)
+    return {
+        'samples': n,
+        'samples_per_sec': n / elapsed if elapsed > 0 else None,
+        'p50_us': percentile(latencies_ns, 50) / 1000,
+        'p99_us': percentile(latencies_ns, 99) / 1000,
+        'retry_rate': (attempts - n) / n,
+        'failure_rate': failures / n,
+    }
+
+
+def clear_caches():
+    """
+    清空斷詞結果與發音查詢的 LRU 快取；已載入的字典與發音索引保留
+    """
+    analysis._analyze.cache_clear()
+    # 尚未載入發音字典時不觸發載入
+    if utils._pronounce2word is not None:
+        utils.Pronounce2Word().cache_clear()
+
+
+def peak_memory(fn, corpus, samples, cold=False):
+    """
+    以 `tracemalloc` 量測執行 `samples` 個樣本時的峰值記憶體（KiB）
+    """
+    tracemalloc.start()
+    try:
+        for i in range(samples):
+            if cold:
+                clear_caches()
+            fn(corpus[i % len(corpus)])
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak / 1024
+
+
+def _maker_once(maker, x):
+    # 與 pipeline 相同的重試邏輯，回傳 (嘗試次數, 是否成功)
+    attempts = 0
+    while attempts < MAX_RETRY:
+        attempts += 1
+        try:
+            maker._make_record(x)
+            return attempts, True
+        except NoCandidateError:
+            return attempts, False
+        except Exception:
+            pass
+    return attempts, False
+
+
+def _warm(fn, corpus, cold):
+    # warm 先以整份語料填滿快取；cold 則在每個樣本前另行清空
+    clear_caches()
+    if not cold:
+        for x in corpus:
+            fn(x)
+
+
+def bench_maker(maker, corpus, samples, memory_samples, cold=False):
+    """
+    量測單一 maker：每秒樣本數、p50/p99 延遲、重試率、失敗率與峰值記憶體
+
+    :param cold: 每個樣本前清空快取，清空的時間不計入延遲與每秒樣本數
+    """
+    _warm(lambda x: _maker_once(maker, x), corpus, cold)
+    latencies, attempts, failures, elapsed = [], 0, 0, 0
+    for i in range(samples):
+        x = corpus[i % len(corpus)]
+        if cold:
+            clear_caches()
+        t = time.perf_counter_ns()
+        n, ok = _maker_once(maker, x)
+        latencies.append(time.perf_counter_ns() - t)
+        attempts += n
+        failures += not ok
+    result = summarize(latencies, sum(latencies) / 1e9, attempts, failures)
+    result['peak_memory_kib'] = peak_memory(lambda x: _maker_once(maker, x), corpus, memory_samples, cold)
+    return result
+
+
+def bench_pipeline(pipeline, corpus, samples, memory_samples, error_per_sent, cold=False):
+    """
+    量測 `Pipeline.__call__`；失敗率為拋出 `ZeorSearchResultsError` 的比例，
+    `maker_calls_per_sample` 為每個樣本平均呼叫 maker 的次數（含重試與 lazy 模式下的回退）
+
+    :param cold: 同 `bench_maker`
+    """
+    def run(x):
+        try:
+            pipeline(x, error_per_sent=error_per_sent, verbose=False, fast_record=True)
+        except ZeorSearchResultsError:
+            pass
+    _warm(run, corpus, cold)
+
+    attempts = [0]
+    for maker in pipeline.makers:
+        _count_attempts(maker, attempts)
+    try:
+        result = _bench_pipeline(pipeline, corpus, samples, error_per_sent, attempts, cold)
+    finally:
+        for maker in pipeline.makers:
+            del maker._make_record
+    result['peak_memory_kib'] = peak_memory(run, corpus, memory_samples, cold)
+    return result
+
+
+def _bench_pipeline(pipeline, corpus, samples, error_per_sent, attempts, cold):
+    latencies, failures = [], 0
+    for i in range(samples):
+        if cold:
+            clear_caches()
+        t = time.perf_counter_ns()
+        try:
+            pipeline(corpus[i % len(corpus)], error_per_sent=error_per_sent, verbose=False, fast_record=True)
+        except ZeorSearchResultsError:
+            failures += 1
+        latencies.append(time.perf_counter_ns() - t)
+    result = summarize(latencies, sum(latencies) / 1e9, attempts[0], failures)
+    del result['retry_rate']
+    result['maker_calls_per_sample'] = attempts[0] / samples
+    return result
+
+
+def _count_attempts(maker, counter):
+    make_record = maker._make_record
+
+    def counted(*args, **kwargs):
+        counter[0] += 1
+        return make_record(*args, **kwargs)
+    maker._make_record = counted
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', 'HEAD'], capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__))
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(samples=2000, memory_samples=200, seed=0, makers=None, max_error_per_sent=5, cache_modes=CACHE_MODES):
+    """
+    執行完整基準測試
+
+    :param samples: 每個項目量測的樣本數
+    :param memory_samples: 量測峰值記憶體時的樣本數
+    :param seed: 隨機種子
+    :param makers: Optional 只量測指定名稱的 maker
+    :param max_error_per_sent: pipeline 量測 `error_per_sent` 1 到此值
+    :param cache_modes: Optional 量測的快取狀態，見 `CACHE_MODES`；結果的項目名稱以 `/cold`、`/warm` 結尾
+    :rtype: dict
+    """
+    corpus = load_corpus()
+    maker_classes = default_maker_classes()
+    if makers:
+        maker_classes = [cls for cls in maker_classes if cls.__name__ in makers]
+    maker_instances = [cls() for cls in maker_classes]
+
+    results = {
+        'meta': {
+            'commit': git_commit(),
+            'time': datetime.now(timezone.utc).isoformat(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'corpus_sentences': len(corpus),
+            'samples': samples,
+            'memory_samples': memory_samples,
+            'seed': seed,
+            'cache_modes': list(cache_modes),
+        },
+        'makers': {},
+        'pipeline': {},
+    }
+
+    with use_rng(random.Random(seed)):
+        for maker in maker_instances:
+            # 預先載入字典與發音索引，避免將一次性的載入時間算進延遲；量測時各自重設快取
+            for x in corpus:
+                _maker_once(maker, x)
+            for mode in cache_modes:
+                results['makers'][f'{maker.__class__.__name__}/{mode}'] = bench_maker(
+                    maker, corpus, samples, memory_samples, cold=mode == 'cold')
+
+        pipelines = {
+            'unweighted': Pipeline(makers=maker_instances),
+            'unweighted_eager': Pipeline(makers=maker_instances, lazy=False),
+            'weighted': Pipeline(makers=maker_instances, maker_weight=[1] * len(maker_instances)),
+        }
+        for name, pipeline in pipelines.items():
+            for error_per_sent in range(1, max_error_per_sent + 1):
+                for mode in cache_modes:
+                    results['pipeline'][f'{name}/error_per_sent={error_per_sent}/{mode}'] = bench_pipeline(
+                        pipeline, corpus, samples, memory_samples, error_per_sent, cold=mode == 'cold')
+
+    return results
+
+
+def compare(base, new, threshold=0.1):
+    """
+    比較兩次結果的每秒樣本數，回傳退化超過 `threshold` 的項目
+
+    :param base: 基準結果
+    :param new: 新結果
+    :retrun: [(項目, 基準值, 新值, 比值)]
+    """
+    rows = []
+    for group in ('makers', 'pipeline'):
+        for name, new_result in new.get(group, {}).items():
+            base_result = base.get(group, {}).get(name)
+            if base_result is None or not base_result['samples_per_sec']:
+                continue
+            ratio = new_result['samples_per_sec'] / base_result['samples_per_sec']
+            rows.append((f'{group}/{name}', base_result['samples_per_sec'], new_result['samples_per_sec'], ratio))
+
+    for key, base_value, new_value, ratio in rows:
+        mark = '  <-- regression' if ratio < 1 - threshold else ''
+        print(f'{key:60s} {base_value:12.1f} {new_value:12.1f} {ratio:6.2f}x{mark}')
+    return [row for row in rows if row[3] < 1 - threshold]
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description='zh-mistake-text-gen 基準測試')
+    sub = parser.add_subparsers(dest='command')
+
+    run_parser = sub.add_parser('run', help='執行基準測試並輸出 JSON')
+    run_parser.add_argument('-o', '--output', default='-', help='輸出 JSON 檔案，預設為 stdout')
+    run_parser.add_argument('--samples', type=int, default=2000)
+    run_parser.add_argument('--memory-samples', type=int, default=200)
+    run_parser.add_argument('--seed', type=int, default=0)
+    run_parser.add_argument('--makers', nargs='+', help='只量測指定的 maker')
+    run_parser.add_argument('--max-error-per-sent', type=int, default=5)
+    run_parser.add_argument('--cache-modes', nargs='+', choices=CACHE_MODES, default=list(CACHE_MODES),
+                            help='cold: 每個樣本前清空快取；warm: 快取已涵蓋整份語料')
+
+    compare_parser = sub.add_parser('compare', help='比較兩份結果的吞吐量')
+    compare_parser.add_argument('base')
+    compare_parser.add_argument('new')
+    compare_parser.add_argument('--threshold', type=float, default=0.1, help='吞吐量下降超過此比例視為退化')
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+
+    if args.command == 'compare':
+        with open(args.base, encoding='utf-8') as f:
+            base = json.load(f)
+        with open(args.new, encoding='utf-8') as f:
+            new = json.load(f)
+        regressions = compare(base, new, args.threshold)
+        sys.exit(1 if regressions else 0)
+
+    if args.command != 'run':
+        build_parser().print_help()
+        return
+
+    results = run(
+        samples=args.samples,
+        memory_samples=args.memory_samples,
+        seed=args.seed,
+        makers=args.makers,
+        max_error_per_sent=args.max_error_per_sent,
+        cache_modes=args.cache_modes
+    )
+    out = json.dumps(results, ensure_ascii=False, indent=2)
+    if args.output == '-':
+        print(out)
+    else:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(out + '\n')
+
+
+if __name__ == '__main__':
+    main()
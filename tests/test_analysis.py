@@ -0,0 +1,17 @@
+from zh_mistake_text_gen.analysis import analyze, SentenceAnalysis
+
+
+def test_analyze_cached():
+    sent = analyze("中文語料生成")
+    assert isinstance(sent, SentenceAnalysis)
+    assert sent == "中文語料生成"
+    assert analyze("中文語料生成") is sent
+    assert analyze(sent) is sent
+    assert sent.tokens is sent.tokens
+
+
+def test_token_offsets():
+    sent = analyze("維基的基本設計理念是讓人們更方便地修正錯誤")
+    assert "".join(sent.tokens) == sent
+    for token, (start, end) in zip(sent.tokens, sent.token_offsets):
+        assert sent[start:end] == token
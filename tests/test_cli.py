@@ -0,0 +1,43 @@
+import pytest
+import json
+from zh_mistake_text_gen.cli import main
+
+
+def test_cli_text_to_jsonl(tmp_path):
+    input_path = tmp_path / "corpus.txt"
+    output_path = tmp_path / "noise.jsonl"
+    sentences = ["中文語料生成", "", "下雨的聲音"]
+    input_path.write_text("\n".join(sentences), encoding="utf-8")
+
+    main([str(input_path), "-o", str(output_path), "--maker-weight", "MissingWordMaker=1", "--seed", "0"])
+
+    records = [json.loads(line) for line in output_path.read_text(encoding="utf-8").splitlines()]
+    assert [r["correct"] for r in records] == ["中文語料生成", "下雨的聲音"]
+    assert all(r["type"] == "MissingWordMaker" for r in records)
+
+
+def test_cli_jsonl_seed_is_reproducible(tmp_path):
+    input_path = tmp_path / "corpus.jsonl"
+    input_path.write_text(
+        "\n".join(json.dumps({"text": "維基的基本設計理念是與其避免人們犯錯"}, ensure_ascii=False) for _ in range(20)),
+        encoding="utf-8"
+    )
+    outputs = []
+    for workers in [1, 2]:
+        output_path = tmp_path / f"noise_{workers}.jsonl"
+        main([str(input_path), "-o", str(output_path), "--maker-weight", "MissingWordMaker=1",
+              "--seed", "7", "--workers", str(workers), "--chunksize", "3"])
+        outputs.append(output_path.read_text(encoding="utf-8"))
+    assert outputs[0] == outputs[1]
+
+
+def test_cli_parquet_output(tmp_path):
+    pq = pytest.importorskip("pyarrow.parquet")
+    input_path = tmp_path / "corpus.txt"
+    output_path = tmp_path / "noise.parquet"
+    input_path.write_text("中文語料生成\n下雨的聲音\n", encoding="utf-8")
+
+    main([str(input_path), "-o", str(output_path), "--maker-weight", "MissingWordMaker=1"])
+
+    table = pq.read_table(str(output_path))
+    assert table.column("correct").to_pylist() == ["中文語料生成", "下雨的聲音"]
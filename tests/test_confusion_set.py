@@ -0,0 +1,60 @@
+import pickle
+from zh_mistake_text_gen.confusion_set import build_confusion_set, ConfusionSet
+from zh_mistake_text_gen.data_maker import PronounceSameWordMaker, PronounceSimilarWordPlusMaker
+
+
+class FakePronounce2Word():
+    han_map = {"一": "yi1", "衣": "yi1", "醫": "yi1", "以": "yi3", "二": "er4"}
+
+    def __init__(self):
+        self.uni2cns_map = {"%X" % ord(c): "" for c in self.han_map}
+
+    def _uni2word(self, uni):
+        return chr(int(uni, 16))
+
+    def to_han(self, x):
+        return self.han_map[x]
+
+    def han2word(self, han):
+        return [c for c, h in self.han_map.items() if h == han]
+
+    def find_same(self, x):
+        return [c for c in self.han2word(self.to_han(x)) if c != x]
+
+    def find_similar(self, x):
+        base = self.to_han(x)[:-1]
+        return [c for c, h in self.han_map.items() if h[:-1] == base and c != x]
+
+    def _find_similar_han_pronounces(self, han, level=1):
+        return sorted(set(h for h in self.han_map.values() if h[:-1] == han[:-1]))
+
+
+def test_build_and_lookup(tmp_path):
+    path = str(tmp_path / "confusion.bin")
+    build_confusion_set(path, p2w=FakePronounce2Word(), level=1, limit_k=10)
+    confusion_set = ConfusionSet(path)
+
+    assert sorted(confusion_set.same("一")) == ["衣", "醫"]
+    assert sorted(confusion_set.similar("一")) == ["以", "衣", "醫"]
+    assert "一" not in confusion_set.similar_plus("一")
+    assert confusion_set.same("二") == ""
+    assert confusion_set.same("𧒽") == ""
+
+    confusion_set = pickle.loads(pickle.dumps(confusion_set))
+    assert sorted(confusion_set.same("衣")) == ["一", "醫"]
+
+
+def test_maker_with_confusion_set(tmp_path):
+    path = str(tmp_path / "confusion.bin")
+    build_confusion_set(path, p2w=FakePronounce2Word(), level=1, limit_k=10)
+    confusion_set = ConfusionSet(path)
+
+    maker = PronounceSameWordMaker(confusion_set=confusion_set)
+    result = maker("一")
+    assert result.incorrect in ["衣", "醫"]
+
+    try:
+        PronounceSimilarWordPlusMaker(confusion_set=confusion_set, level=2)
+    except ValueError:
+        return
+    assert False
@@ -0,0 +1,43 @@
+from zh_mistake_text_gen import Pipeline
+from zh_mistake_text_gen.data_maker import MissingWordMaker, RedundantWordMaker
+from zh_mistake_text_gen.dataset import NoiseDataset
+
+test_inputs = ["維基的基本設計理念是與其避免人們犯錯", "倒不如讓人們更方便地修正錯誤", "", "中文語料生成"] * 5
+pipeline = Pipeline(makers=[MissingWordMaker(), RedundantWordMaker()], maker_weight=[0.5, 0.5])
+
+
+def dump(results):
+    return [r.json() for r in results]
+
+
+def test_noise_dataset_epoch_and_prefetch():
+    dataset = NoiseDataset(test_inputs, pipeline=pipeline, seed=0, prefetch=2)
+    first = dump(dataset)
+    assert len(first) == 15
+    assert first == dump(NoiseDataset(test_inputs, pipeline=pipeline, seed=0, prefetch=0))
+    assert first == dump(dataset)
+
+    dataset.set_epoch(1)
+    assert first != dump(dataset)
+
+    results = list(NoiseDataset(test_inputs, pipeline=pipeline, seed=0, skip_failed=False))
+    assert len(results) == len(test_inputs)
+    assert isinstance(results[2], Exception)
+
+
+def test_noise_dataset_shard():
+    single = dump(NoiseDataset(test_inputs, pipeline=pipeline, seed=0, skip_failed=False, no_change_on_gen_fail=True))
+    merged = [None] * len(test_inputs)
+    for shard_index in range(3):
+        dataset = NoiseDataset(test_inputs, pipeline=pipeline, seed=0, shard=f"{shard_index}/3",
+                               skip_failed=False, no_change_on_gen_fail=True)
+        merged[shard_index::3] = dump(dataset)
+    assert merged == single
+
+
+def test_noise_dataset_early_stop():
+    dataset = NoiseDataset(test_inputs * 100, pipeline=pipeline, prefetch=4)
+    for i, result in enumerate(dataset):
+        if i == 3:
+            break
+    assert result.correct in test_inputs
@@ -0,0 +1,39 @@
+from zh_mistake_text_gen import Pipeline
+from zh_mistake_text_gen.data_maker import MissingWordMaker, MissingVocabMaker
+from zh_mistake_text_gen.document import split_sentences, noise_documents
+from zh_mistake_text_gen.exception import ZeorSearchResultsError
+
+doc = "他說：「好。」然後走了。\n\n  第二段！真的嗎？？是的……結束"
+pipeline = Pipeline(makers=[MissingWordMaker(), MissingVocabMaker()])
+
+
+def test_split_sentences():
+    assert list(split_sentences(doc)) == ["他說：「好。」", "然後走了。\n\n", "  第二段！", "真的嗎？？", "是的……", "結束"]
+    assert "".join(split_sentences(doc)) == doc
+    assert list(split_sentences("")) == []
+    assert list(split_sentences("一二三四五，六七八九十一二三四，五六", max_len=6)) == ["一二三四五，", "六七八九十一", "二三四，五六"]
+
+
+def test_noise_documents():
+    results = list(noise_documents([doc, "", doc], pipeline, error_budget=3, seed=0))
+    assert results[0].correct == doc
+    assert len(results[0].type.split("_")) == 3
+    assert len(results[0].incorrect) <= len(doc) - 3
+    # 空白與換行不會被編輯
+    assert "\n\n  " in results[0].incorrect
+    assert isinstance(results[1], ZeorSearchResultsError)
+    again = list(noise_documents([doc, "", doc], pipeline, error_budget=3, seed=0))
+    assert [r.json() for r in again[::2]] == [r.json() for r in results[::2]]
+
+    # 預算多於句數時，部分句子會有多個錯誤
+    sentences, = noise_documents([doc], pipeline, error_budget=lambda x: 8, reassemble=False, seed=1, fast_record=True)
+    assert [r.correct for r in sentences] == ["他說：「好。」", "然後走了。", "第二段！", "真的嗎？？", "是的……", "結束"]
+    assert sum(len(r.type.split("_")) for r in sentences if r.type != "NoChangeMaker") == 8
+
+    result, = noise_documents([""], pipeline, no_change_on_gen_fail=True)
+    assert result.type == "NoChangeMaker"
+
+    # 預算為 0 時原文不變，不視為失敗
+    for error_budget in (0, lambda x: len(x) // 100):
+        result, = noise_documents([doc], pipeline, error_budget=error_budget)
+        assert (result.type, result.incorrect) == ("NoChangeMaker", doc)
@@ -2,10 +2,41 @@ from zh_mistake_text_gen.data_maker import *
 from zh_mistake_text_gen.exception import *
 
 def test_MistakeTextHappendOnDisableWordsError():
-    maker = MistakWordMaker()
+    class UncheckedMistakWordMaker(MistakWordMaker):
+        def _feasible(self, x, position):
+            return True
+
+    maker = UncheckedMistakWordMaker()
     try:
         maker("的")
     except MistakeTextHappendOnDisableWordsError:
         assert True
         return
-    assert False
\ No newline at end of file
+    assert False
+
+def test_NoCandidateError():
+    try:
+        MistakWordMaker()("的")
+        assert False
+    except NoCandidateError:
+        pass
+
+    maker = MissingWordHighFreqMaker()
+    assert maker.candidates("𧒽") == []
+    try:
+        maker("𧒽")
+    except NoCandidateError:
+        return
+    assert False
+
+def test_TraditionalSimplifiedSameError():
+    class SimplifyMaker(BaseDataMaker):
+        def edit_at(self, x, position):
+            return self._edit(x, position, position+1, self.t2s(x[position]))
+
+    maker = SimplifyMaker()
+    try:
+        maker("語")
+    except TraditionalSimplifiedSameError:
+        return
+    assert False
@@ -0,0 +1,56 @@
+import json
+import subprocess
+import sys
+
+# 冷啟動時間上限（秒），超過即視為效能退化
+IMPORT_BUDGET = 0.5
+PIPELINE_BUDGET = 1.5
+
+HEAVY_MODULES = ['jieba', 'opencc', 'py_chinese_pronounce', 'pandas', 'numpy', 'edit_distance']
+
+_SCRIPT = """
+import json, sys, time
+t = time.perf_counter()
+import zh_mistake_text_gen
+import_time = time.perf_counter() - t
+after_import = [m for m in %(heavy)r if m in sys.modules]
+t = time.perf_counter()
+zh_mistake_text_gen.Pipeline()
+pipeline_time = time.perf_counter() - t
+after_pipeline = [m for m in %(heavy)r if m in sys.modules]
+print(json.dumps([import_time, pipeline_time, after_import, after_pipeline]))
+"""
+
+
+def _cold_start():
+    out = subprocess.run(
+        [sys.executable, '-c', _SCRIPT % {'heavy': HEAVY_MODULES}],
+        check=True, capture_output=True, text=True
+    ).stdout
+    return json.loads(out.splitlines()[-1])
+
+
+def test_cold_import_and_default_pipeline_budget():
+    import_time, pipeline_time, after_import, after_pipeline = _cold_start()
+    assert after_import == []
+    assert after_pipeline == []
+    assert import_time < IMPORT_BUDGET
+    assert pipeline_time < PIPELINE_BUDGET
+
+
+def test_default_pipeline_is_quiet():
+    out = subprocess.run(
+        [sys.executable, '-c', 'import zh_mistake_text_gen; zh_mistake_text_gen.Pipeline()'],
+        check=True, capture_output=True, text=True
+    )
+    assert out.stdout == ''
+
+
+def test_star_import_provides_pipeline():
+    out = subprocess.run(
+        [sys.executable, '-c',
+         'import zh_mistake_text_gen; print("Pipeline" in dir(zh_mistake_text_gen)); '
+         'from zh_mistake_text_gen import *; print(Pipeline.__name__)'],
+        check=True, capture_output=True, text=True
+    )
+    assert out.stdout.split() == ['True', 'Pipeline']
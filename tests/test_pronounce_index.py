@@ -0,0 +1,29 @@
+import pytest
+from zh_mistake_text_gen.pronounce_index import PronounceIndex, levenshtein
+
+keys = ["zhong1", "zhong4", "zong1", "chong2", "zhang1", "zheng4", "jiong3", "a1", "ai4", "yi1", "shi4", "si4"]
+
+
+def brute_force(han, level):
+    return tuple(k for k in keys if levenshtein(han, k) <= level)
+
+
+def test_pronounce_index_matches_brute_force(tmp_path):
+    index = PronounceIndex(keys, max_level=2)
+    for han in keys + ["zhon1", "xiong1", "a"]:
+        for level in (0, 1, 2):
+            assert index.query(han, level) == brute_force(han, level)
+
+    path = tmp_path / "index.json"
+    index.save(path)
+    loaded = PronounceIndex.load(path)
+    assert loaded.query("zhong1", 2) == index.query("zhong1", 2)
+
+    with pytest.raises(ValueError):
+        index.query("zhong1", 3)
+
+
+def test_levenshtein_limit():
+    assert levenshtein("zhong1", "zong1") == 1
+    assert levenshtein("zhong1", "a1") == 5
+    assert levenshtein("zhong1", "a1", limit=2) == 3
@@ -0,0 +1,21 @@
+from zh_mistake_text_gen.resource import get_resource
+from zh_mistake_text_gen.data_maker import *
+
+
+def test_resource_loaded_once():
+    assert get_resource('high_freq_zh_char') is get_resource('high_freq_zh_char')
+    assert get_resource('t2s') is get_resource('t2s')
+
+
+def test_makers_share_resource():
+    maker_a = MistakeWordHighFreqMaker()
+    maker_b = MissingWordHighFreqMaker()
+    assert maker_a.high_freq_zh_char is maker_b.high_freq_zh_char
+    assert maker_a.high_freq_zh_char_set is maker_b.high_freq_zh_char_set
+    assert RandomInsertVacabMaker().sc_dict is RandomInsertVacabMaker().sc_dict
+
+
+def test_t2s_char():
+    t2s_char = get_resource('t2s_char')
+    assert t2s_char('中文語料生成') == get_resource('t2s').convert('中文語料生成')
+    assert t2s_char('') == ''
@@ -0,0 +1,55 @@
+import random
+from collections import Counter
+from zh_mistake_text_gen import sampling
+from zh_mistake_text_gen.sampling import AliasSampler, WeightedChoice, use_rng
+
+
+def test_alias_sampler_distribution():
+    weights = [0.1, 0.0, 0.6, 0.3]
+    sampler = AliasSampler(weights)
+    rng = random.Random(0)
+    n = 20000
+    counts = Counter(sampler.sample(rng) for _ in range(n))
+    assert counts[1] == 0
+    for i, w in enumerate(weights):
+        assert abs(counts[i] / n - w) < 0.02
+
+    counts = Counter(int(i) for i in sampler.sample_many(n))
+    assert counts[1] == 0
+    for i, w in enumerate(weights):
+        assert abs(counts[i] / n - w) < 0.02
+
+
+def test_alias_sampler_invalid_weights():
+    for weights in [[], [0, 0], [1, -1]]:
+        try:
+            AliasSampler(weights)
+            assert False
+        except ValueError:
+            pass
+
+
+def test_weighted_choice():
+    chooser = WeightedChoice("abc", [0, 1, 0])
+    assert chooser.choice() == "b"
+    assert chooser.choices(5) == ["b"] * 5
+    assert set(WeightedChoice("abc").choices(100)) <= set("abc")
+
+
+def test_sample_many_rng():
+    sampler = AliasSampler([1, 2, 3])
+    chooser = WeightedChoice("abc")
+    np = sampling._np if sampling._np is not False else sampling._numpy()
+    # 有無 NumPy 都接受 `random.Random`，並依 `use_rng` 設定的亂數決定結果
+    for numpy in (np, None):
+        sampling._np = numpy
+        try:
+            assert list(sampler.sample_many(50, random.Random(0))) == list(sampler.sample_many(50, random.Random(0)))
+            assert chooser.choices(50, random.Random(0)) == chooser.choices(50, random.Random(0))
+            draws = []
+            for _ in range(2):
+                with use_rng(random.Random(1)):
+                    draws.append((list(sampler.sample_many(50)), chooser.choices(50)))
+            assert draws[0] == draws[1]
+        finally:
+            sampling._np = np
@@ -36,3 +36,73 @@ def test_is_mistake_happend_on_disable_words():
     ori_a = "黃生生你好"
     new_b = "黃先聲你好嗎"
     assert is_mistake_happend_on_disable_words(ori_a,new_b) == True
+
+def test_is_mistake_happend_on_disable_span():
+    assert is_mistake_happend_on_disable_span("的", "地") == True
+    assert is_mistake_happend_on_disable_span("雨", "與") == False
+    assert is_mistake_happend_on_disable_span("的", "") == True
+    assert is_mistake_happend_on_disable_span("", "嗎") == True
+    assert is_mistake_happend_on_disable_span("先生", "先聲") == False
+    assert is_mistake_happend_on_disable_span("你好", "妳好") == True
+
+def test_disable_word_index():
+    index = DisableWordIndex(["的", "台積電", "積體電路"])
+    assert "的" in index
+    assert "台積" not in index
+    assert sorted(index.find_all("台積電是積體電路公司")) == [(0, 3), (4, 8)]
+
+    assert index.touches("台積電是積體電路公司", 1, 2) == True
+    assert index.touches("台積電是積體電路公司", 3, 4) == False
+    assert index.touches("台積電是積體電路公司", 2, 2) == True
+    assert index.touches("台積電是積體電路公司", 3, 3) == False
+
+
+def test_set_disable_words():
+    default_index = get_disable_words()
+    try:
+        set_disable_words(list(default_index) + ["台積電"])
+        assert is_mistake_happend_on_disable_edit("台積電公司", "台基電公司", 1, 2, 2) == True
+        assert is_mistake_happend_on_disable_edit("台積電公司", "台積電工司", 3, 4, 4) == False
+    finally:
+        set_disable_words(default_index)
+    assert is_mistake_happend_on_disable_edit("台積電公司", "台基電公司", 1, 2, 2) == False
+
+class FakePronounce2Word():
+    calls = 0
+    uni2cns_map = {0x4e2d: "1-4463"}
+
+    def find_same(self, word):
+        FakePronounce2Word.calls += 1
+        if word == "J":
+            raise KeyError(word)
+        return [word + "1", word + "2"]
+
+    def __getattr__(self, name):
+        return self.find_same
+
+def test_cached_pronounce2word():
+    p2w = CachedPronounce2Word(FakePronounce2Word(), maxsize=2)
+    result = p2w.find_same("中")
+    assert result == ("中1", "中2")
+    assert p2w.find_same("中") is result
+    assert FakePronounce2Word.calls == 1
+    assert p2w.uni2cns_map == {0x4e2d: "1-4463"}
+
+    for _ in range(2):
+        try:
+            p2w.find_same("J")
+            assert False
+        except KeyError:
+            pass
+    assert FakePronounce2Word.calls == 2
+
+    p2w.find_same("文")
+    p2w.find_same("中")
+    stats = p2w.cache_stats()["find_same"]
+    assert stats["hits"] == 2 and stats["misses"] == 4
+    assert stats["size"] == 2 and stats["evictions"] == 2
+    assert FakePronounce2Word.calls == 4
+
+    p2w.configure(maxsize=1000, max_bytes=0)
+    p2w.find_same("中")
+    assert p2w.cache_stats()["find_same"]["size"] == 0
@@ -0,0 +1,50 @@
+import pickle
+import random
+from zh_mistake_text_gen import Pipeline
+from zh_mistake_text_gen import sampling
+from zh_mistake_text_gen.data_maker import MissingWordMaker, MissingVocabMaker
+from zh_mistake_text_gen.variant_store import build_variant_store, VariantStore
+
+test_inputs = ["維基的基本設計理念是與其避免人們犯錯", "", "中文", "英國作家J·K·羅琳的奇幻文學系列小說"]
+pipeline = Pipeline(makers=[MissingWordMaker(), MissingVocabMaker()])
+
+
+def test_build_and_read(tmp_path):
+    path = str(tmp_path / "variants.bin")
+    n_sentences, n_variants = build_variant_store(path, iter(test_inputs), k=4, pipeline=pipeline, seed=0)
+    store = VariantStore(path)
+    # "中文" 只有三種刪除結果
+    assert [store.num_variants(i) for i in range(len(store))] == [4, 0, 3, 4]
+    assert (len(store), store.n_variants) == (n_sentences, n_variants) == (4, 11)
+
+    expected = pipeline.variants(test_inputs[0], 4, verbose=False, rng=sampling.sample_rng(0, 0))
+    assert [store.variant(0, j) for j in range(4)] == expected
+    assert store.correct(3) == test_inputs[3]
+    assert store.sample(1) is None
+    assert store.sample(2, rng=random.Random(0)).correct == "中文"
+
+    store = pickle.loads(pickle.dumps(store))
+    assert store.variant(3, 1, fast_record=True).correct == test_inputs[3]
+
+
+def test_epoch_sampling(tmp_path):
+    path = str(tmp_path / "variants.bin")
+    build_variant_store(path, test_inputs * 10, k=4, pipeline=pipeline, seed=0)
+    store = VariantStore(path)
+
+    indices = list(store.epoch_indices(0, seed=1))
+    assert indices == list(store.epoch_indices(0, seed=1))
+    assert indices != list(store.epoch_indices(1, seed=1))
+    assert [v for i, v in enumerate(indices) if i % 4 == 1] == [-1] * 10
+
+    # 未安裝 NumPy 時的結果相同
+    np, sampling._np = sampling._np, None
+    try:
+        assert list(store.epoch_indices(0, seed=1)) == indices
+    finally:
+        sampling._np = np
+
+    records = list(store.iter_epoch(0, seed=1))
+    assert len(records) == 30
+    assert all(r.incorrect != r.correct for r in records)
+    assert [r.correct for r in records] == [x for x in test_inputs * 10 if x != ""]
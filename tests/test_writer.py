@@ -0,0 +1,35 @@
+import pytest
+from zh_mistake_text_gen.data_model import NoiseCorpus, NoiseRecord
+from zh_mistake_text_gen.writer import ColumnarWriter
+
+pa = pytest.importorskip("pyarrow")
+
+
+def test_noise_record():
+    record = NoiseRecord(correct="下雨的聲音", incorrect="下與的聲音", type="PronounceSimilarWordMaker",
+                         incorrect_start_at=1, incorrect_end_at=2, span="與", correct_span="雨")
+    model = record.to_model()
+    assert isinstance(model, NoiseCorpus)
+    assert record.json() == model.json()
+    assert NoiseRecord.from_model(model) == record
+
+
+@pytest.mark.parametrize("suffix", [".parquet", ".arrow"])
+def test_columnar_writer(tmp_path, suffix):
+    path = tmp_path / f"noise{suffix}"
+    records = [
+        NoiseRecord(correct="下雨的聲音", incorrect="下與的聲音", type="A",
+                    incorrect_start_at=1, incorrect_end_at=2, span="與", correct_span="雨"),
+        NoiseCorpus(correct="中文", incorrect="中文", type="NoChangeMaker"),
+    ] * 3
+    with ColumnarWriter(str(path), batch_size=4) as writer:
+        writer.write_many(records)
+
+    if suffix == ".parquet":
+        import pyarrow.parquet as pq
+        table = pq.read_table(str(path))
+    else:
+        table = pa.ipc.open_file(str(path)).read_all()
+    assert table.num_rows == 6
+    assert table.column("incorrect").to_pylist()[:2] == ["下與的聲音", "中文"]
+    assert table.column("incorrect_start_at").to_pylist()[:2] == [1, None]
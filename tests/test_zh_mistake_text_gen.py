@@ -1,5 +1,10 @@
 from zh_mistake_text_gen import Pipeline
+from zh_mistake_text_gen.data_maker import MissingWordMaker, MissingVocabMaker, RedundantWordMaker, RandomInsertVacabMaker, MistakeWordHighFreqMaker, MissingWordHighFreqMaker
+from zh_mistake_text_gen.data_maker import BaseDataMaker
+from zh_mistake_text_gen.data_model import NoiseCorpus
+from zh_mistake_text_gen.exception import ZeorSearchResultsError
 import time
+import random
 def test_pipeline():
     test_inputs = [
         ""
@@ -37,3 +42,250 @@ def test_pipeline():
         
     if len(already_gen_type) != len(all_maker_type):
         assert False
+
+def test_pipeline_generate_batch():
+    test_inputs = [
+        "中文語料生成",
+        "",
+        "維基媒體基金會是按美國國內稅收法501(c)(3)登記的非營利慈善機構",
+    ] * 5
+    pipeline = Pipeline(makers=[MissingWordMaker()])
+    results = pipeline.generate_batch(test_inputs, workers=2, chunksize=4)
+    assert len(results) == len(test_inputs)
+    for test_input, result in zip(test_inputs, results):
+        if test_input == "":
+            assert isinstance(result, Exception)
+        else:
+            assert result.correct == test_input
+
+def test_pipeline_lazy_call_fallback():
+    class CountingMaker(MissingWordMaker):
+        calls = 0
+
+        def make(self, x):
+            CountingMaker.calls += 1
+            return super().make(x)
+
+    class FailMaker(MissingWordMaker):
+        def make(self, x):
+            raise ZeorSearchResultsError()
+
+    pipeline = Pipeline(makers=[FailMaker(), CountingMaker(), FailMaker()])
+    for _ in range(20):
+        result = pipeline("中文語料生成", verbose=False)
+        assert result.type == "CountingMaker"
+    assert CountingMaker.calls == 20
+
+def test_maker_edit_span():
+    makers = [MissingWordMaker(), MissingVocabMaker(), RedundantWordMaker(), RandomInsertVacabMaker()]
+    for maker in makers:
+        for _ in range(50):
+            try:
+                result = maker("維基的基本設計理念是讓人們更方便地修正錯誤")
+            except Exception:
+                continue
+            start, end = result.incorrect_start_at, result.incorrect_end_at
+            assert result.incorrect[start:end] == result.span
+            assert result.incorrect[:start] + result.correct_span + result.incorrect[end:] == result.correct
+
+def test_maker_candidates():
+    sent = "下雨的聲音"
+    maker = MissingWordMaker()
+    assert maker.candidates(sent) == [0, 1, 3, 4]
+    for _ in range(20):
+        assert maker(sent).correct_span != "的"
+
+    maker = RandomInsertVacabMaker()
+    assert maker.candidates(sent) == [0, 1, 2, 3, 4, 5]
+
+def test_pipeline_seed_and_shard():
+    test_inputs = ["維基的基本設計理念是與其避免人們犯錯", "倒不如讓人們更方便地修正錯誤", "中文語料生成"] * 10
+    pipeline = Pipeline(
+        makers=[MissingWordMaker(), RedundantWordMaker(), MistakeWordHighFreqMaker()],
+        maker_weight=[0.2, 0.3, 0.5]
+    )
+
+    def dump(results):
+        return [r.json() for r in results]
+
+    single = dump(pipeline.generate_batch(test_inputs, workers=1, seed=3))
+    assert single == dump(pipeline.generate_batch(test_inputs, workers=2, chunksize=4, seed=3))
+    assert single != dump(pipeline.generate_batch(test_inputs, workers=1, seed=4))
+
+    num_shards = 3
+    merged = [None] * len(test_inputs)
+    for shard_index in range(num_shards):
+        shard_results = dump(pipeline.generate_batch(test_inputs, workers=1, seed=3, shard=f"{shard_index}/{num_shards}"))
+        merged[shard_index::num_shards] = shard_results
+    assert merged == single
+
+def test_pipeline_stats():
+    class FailMaker(MissingWordMaker):
+        def make(self, x):
+            raise ZeorSearchResultsError()
+
+    snapshots = []
+    pipeline = Pipeline(makers=[FailMaker(), MissingWordMaker()], stats_hook=snapshots.append, stats_interval=0)
+    for _ in range(10):
+        pipeline("中文語料生成", verbose=False)
+    stats = pipeline.stats()
+    assert stats["MissingWordMaker"]["calls"] == stats["MissingWordMaker"]["successes"] == 10
+    assert stats["FailMaker"]["successes"] == 0
+    assert stats["FailMaker"]["failures"]["ZeorSearchResultsError"] == 5 * stats["FailMaker"]["calls"]
+    assert stats["FailMaker"]["retries"] == 4 * stats["FailMaker"]["calls"]
+    assert len(snapshots) == 10
+    assert Pipeline(makers=[MissingWordMaker()]).stats() == {}
+
+def test_pipeline_stats_merge_from_workers():
+    pipeline = Pipeline(makers=[MissingWordMaker()], instrument=True)
+    pipeline.generate_batch(["中文語料生成", ""] * 4, workers=2, chunksize=2)
+    stats = pipeline.stats(reset=True)
+    assert stats["MissingWordMaker"]["calls"] == 8
+    assert stats["MissingWordMaker"]["successes"] == 4
+    assert stats["MissingWordMaker"]["failures"] == {"NoCandidateError": 4}
+    assert pipeline.stats() == {}
+
+    # 主進程已有的統計不會經由子進程重複計入
+    for _ in range(10):
+        pipeline("中文語料生成", verbose=False)
+    pipeline.generate_batch(["中文語料生成"] * 8, workers=2, chunksize=2)
+    assert pipeline.stats()["MissingWordMaker"]["calls"] == 18
+
+    import asyncio
+    with pipeline.process_executor(2) as executor:
+        asyncio.run(pipeline.agenerate("中文語料生成", executor=executor))
+    assert pipeline.stats()["MissingWordMaker"]["calls"] == 19
+
+def test_pipeline_agenerate_and_astream():
+    import asyncio
+    from concurrent.futures import ThreadPoolExecutor
+
+    test_inputs = ["維基的基本設計理念是與其避免人們犯錯", "", "中文語料生成"] * 4
+    pipeline = Pipeline(makers=[MissingWordMaker(), MissingVocabMaker()], maker_weight=[0.5, 0.5])
+
+    async def source():
+        for x in test_inputs:
+            await asyncio.sleep(0)
+            yield x
+
+    async def run():
+        result = await pipeline.agenerate("中文語料生成")
+        assert result.correct == "中文語料生成"
+        try:
+            await pipeline.agenerate("")
+            assert False
+        except ZeorSearchResultsError:
+            pass
+
+        with ThreadPoolExecutor(2) as executor:
+            streamed = [r async for r in pipeline.astream(source(), seed=3, executor=executor, max_in_flight=2)]
+        with pipeline.process_executor(2) as executor:
+            from_process = [r async for r in pipeline.astream(test_inputs, seed=3, executor=executor)]
+
+        stream = pipeline.astream(test_inputs * 100, max_in_flight=4)
+        assert (await stream.__anext__()).correct == test_inputs[0]
+        await stream.aclose()
+        return streamed, from_process
+
+    streamed, from_process = asyncio.run(run())
+    expected = pipeline.generate_batch(test_inputs, workers=1, seed=3)
+    for results in (streamed, from_process):
+        assert len(results) == len(test_inputs)
+        for r, e in zip(results, expected):
+            if isinstance(e, Exception):
+                assert isinstance(r, type(e))
+            else:
+                assert r.json() == e.json()
+
+def test_pipeline_multi_edit():
+    sent = "維基的基本設計理念是與其避免人們犯錯倒不如讓人們更方便地修正錯誤"
+    pipeline = Pipeline(makers=[MissingWordMaker(), RedundantWordMaker()])
+    for error_per_sent in range(2, 6):
+        for _ in range(20):
+            result = pipeline(sent, error_per_sent=error_per_sent, verbose=False)
+            types = result.type.split("_")
+            assert len(types) == error_per_sent
+            assert result.correct == sent
+            assert len(result.incorrect) == len(sent) + types.count("RedundantWordMaker") - types.count("MissingWordMaker")
+
+    # 可編輯的位置不足時，不會在同一位置重複編輯
+    pipeline = Pipeline(makers=[MissingWordMaker()])
+    result = pipeline("中文", error_per_sent=3, no_change_on_gen_fail=True, verbose=False)
+    assert result.type == "MissingWordMaker_MissingWordMaker_NoChangeMaker"
+    assert result.incorrect == ""
+
+def test_pipeline_multi_edit_no_cancel():
+    # 刪去的字不會被另一個編輯插回，合併結果不會與原句相同
+    pipeline = Pipeline(makers=[MissingWordMaker(), RedundantWordMaker(), RandomInsertVacabMaker()])
+    for sent in ("中文語料生成", "好好學習"):
+        for _ in range(500):
+            result = pipeline(sent, error_per_sent=2, verbose=False)
+            assert result.incorrect != result.correct
+
+def test_pipeline_multi_edit_custom_make():
+    # 只實作 `make`、不回報編輯位置的 maker 改為逐次編輯前一個結果
+    class SuffixMaker(BaseDataMaker, default=False):
+        def make(self, x):
+            return NoiseCorpus(correct=str(x), incorrect=str(x) + "了")
+
+    pipeline = Pipeline(makers=[SuffixMaker()])
+    result = pipeline("中文語料生成", error_per_sent=3, verbose=False)
+    assert result.type == "SuffixMaker_SuffixMaker_SuffixMaker"
+    assert result.incorrect == "中文語料生成了了了"
+
+    pipeline = Pipeline(makers=[SuffixMaker(), MissingWordMaker()])
+    for _ in range(20):
+        result = pipeline("中文語料生成", error_per_sent=3, no_change_on_gen_fail=True, verbose=False)
+        assert result.correct == "中文語料生成"
+        assert len(result.type.split("_")) == 3
+
+def test_pipeline_multi_edit_feasible():
+    # 位置足夠時每次都能成功，相鄰的位置也可以編輯
+    pipeline = Pipeline(makers=[MissingWordMaker()])
+    for sent, error_per_sent in (("中文語料生成", 3), ("中文語料生成", 6), ("我們明天一起去圖書館", 5), ("下雨了", 2)):
+        for _ in range(100):
+            result = pipeline(sent, error_per_sent=error_per_sent, verbose=False)
+            assert len(result.incorrect) == len(sent) - error_per_sent
+
+    pipeline = Pipeline(makers=[MissingVocabMaker(), RedundantWordMaker()])
+    for _ in range(100):
+        result = pipeline("中文語料生成", error_per_sent=4, verbose=False)
+        assert len(result.type.split("_")) == 4
+
+def test_pipeline_variants():
+    sent = "中文語料生成"
+    pipeline = Pipeline(makers=[MissingWordMaker(), MissingVocabMaker()], instrument=True)
+    results = pipeline.variants(sent, 100, verbose=False)
+    incorrects = [r.incorrect for r in results]
+    # 編輯空間用盡時提前結束，且結果不重複
+    assert len(set(incorrects)) == len(incorrects)
+    assert {sent[:i] + sent[i+1:] for i in range(len(sent))} <= set(incorrects)
+    assert sent not in incorrects
+    assert all(r.correct == sent for r in results)
+    assert sum(s["calls"] for s in pipeline.stats().values()) < 2 * 100
+
+    assert len(pipeline.variants(sent, 3, verbose=False)) == 3
+    assert [r.json() for r in pipeline.variants(sent, 4, rng=random.Random(0))] == \
+        [r.json() for r in pipeline.variants(sent, 4, rng=random.Random(0))]
+    assert len(Pipeline(makers=[MissingWordMaker()]).variants(sent, 20, unique=False, verbose=False)) == 20
+
+    # 權重為 0 的 maker 不會被抽中
+    pipeline = Pipeline(makers=[MissingWordMaker(), MissingVocabMaker()], maker_weight=[1, 0])
+    results = pipeline.variants(sent, 100, verbose=False)
+    assert len(results) == len(sent)
+    assert all(r.type == "MissingWordMaker" for r in results)
+
+def test_pipeline_adaptive():
+    # 罕用字句子沒有高頻字可刪，MissingWordHighFreqMaker 必定失敗
+    sents = ["維基的基本設計理念是與其避免人們犯錯倒不如讓人們更方便地修正錯誤", "中文語料生成", "英國作家J·K·羅琳的奇幻文學系列小說", "磡𧒽犇骉驫"]
+    counts = {}
+    for adaptive in (False, True):
+        pipeline = Pipeline(makers=[MissingWordMaker(), MissingWordHighFreqMaker()], maker_weight=[1, 1], adaptive=adaptive)
+        rng = random.Random(0)
+        types = [pipeline(sents[i % 4], no_change_on_gen_fail=True, verbose=False, rng=rng).type for i in range(800)]
+        counts[adaptive] = {t: types.count(t) for t in set(types)}
+
+    assert counts[False]["NoChangeMaker"] > 50
+    # 失敗時改用其他 maker，並在可成功的句子上多選 MissingWordHighFreqMaker 以維持 1:1 的比例
+    assert "NoChangeMaker" not in counts[True]
+    assert abs(counts[True]["MissingWordHighFreqMaker"] / 800 - 0.5) < 0.02
@@ -1 +1,13 @@
-from .pipeline import Pipeline
\ No newline at end of file
+__all__ = ['Pipeline']
+
+
+def __getattr__(name):
+    # 延遲匯入：`import zh_mistake_text_gen` 不會載入 jieba、OpenCC 等依賴
+    if name == 'Pipeline':
+        from .pipeline import Pipeline
+        return Pipeline
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
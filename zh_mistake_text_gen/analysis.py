@@ -0,0 +1,51 @@
+from functools import cached_property, lru_cache
+
+ANALYSIS_CACHE_SIZE = 4096
+
+
+class SentenceAnalysis(str):
+    """
+    帶有斷詞結果快取的句子，可直接當作 `str` 使用
+    """
+
+    @cached_property
+    def tokens(self):
+        """
+        jieba 斷詞結果；jieba 與其字典在第一次斷詞時才載入
+
+        :rtype: tuple[str]
+        """
+        import jieba
+        return tuple(jieba.cut(str(self)))
+
+    @cached_property
+    def token_offsets(self):
+        """
+        每個詞在句子中的 (起始, 結束) 字元位置
+
+        :rtype: tuple[tuple[int, int]]
+        """
+        offsets = []
+        start = 0
+        for token in self.tokens:
+            offsets.append((start, start + len(token)))
+            start += len(token)
+        return tuple(offsets)
+
+
+@lru_cache(maxsize=ANALYSIS_CACHE_SIZE)
+def _analyze(text):
+    return SentenceAnalysis(text)
+
+
+def analyze(x):
+    """
+    取得句子的分析物件；相同句子共用同一份快取（LRU，上限 `ANALYSIS_CACHE_SIZE` 句）
+
+    :param x: 句子
+    :type x: str
+    :rtype: SentenceAnalysis
+    """
+    if isinstance(x, SentenceAnalysis):
+        return x
+    return _analyze(x)
@@ -0,0 +1,130 @@
+import argparse
+import json
+import sys
+from loguru import logger
+from . import data_maker
+from .pipeline import Pipeline
+from .writer import ColumnarWriter
+
+
+def parse_maker_weight(items):
+    """
+    解析 `NAME=WEIGHT` 形式的 maker 權重
+
+    :param items: 例如 `["MissingWordMaker=0.2", "PronounceSameVocabMaker=0.8"]`
+    :retrun: (makers, maker_weight)
+    """
+    makers, maker_weight = [], []
+    for item in items:
+        name, sep, weight = item.partition('=')
+        if not sep:
+            raise ValueError(f"maker weight should be NAME=WEIGHT, got `{item}`")
+        maker_cls = getattr(data_maker, name, None)
+        if not (isinstance(maker_cls, type) and issubclass(maker_cls, data_maker.BaseDataMaker)):
+            raise ValueError(f"unknown maker `{name}`")
+        makers.append(maker_cls())
+        maker_weight.append(float(weight))
+    return makers, maker_weight
+
+
+def read_sentences(f, input_format, text_field):
+    """
+    逐行讀取語料，略過空行
+    """
+    for line in f:
+        line = line.strip()
+        if line == '':
+            continue
+        if input_format == 'jsonl':
+            line = json.loads(line)[text_field]
+        yield line
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog='zh-mistake-text-gen',
+        description='逐行讀取中文語料並生成錯誤句，輸出 JSONL'
+    )
+    parser.add_argument('input', help='輸入檔案，`-` 表示 stdin')
+    parser.add_argument('-o', '--output', default='-', help='輸出檔案，預設為 stdout')
+    parser.add_argument('--output-format', choices=['auto', 'jsonl', 'parquet', 'arrow'], default='auto',
+                        help='輸出格式，auto 依副檔名判斷；parquet/arrow 需要 pyarrow')
+    parser.add_argument('--input-format', choices=['auto', 'text', 'jsonl'], default='auto',
+                        help='輸入格式，auto 依副檔名判斷')
+    parser.add_argument('--text-field', default='text', help='JSONL 輸入的文字欄位')
+    parser.add_argument('--error-per-sent', type=int, default=1, help='每句要多少錯誤')
+    parser.add_argument('--maker-weight', nargs='+', metavar='NAME=WEIGHT',
+                        help='指定 maker 與其被抽中的權重')
+    parser.add_argument('--no-change-on-gen-fail', action='store_true',
+                        help='生成失敗時輸出原句')
+    parser.add_argument('--seed', type=int, default=None, help='隨機種子')
+    parser.add_argument('--shard', default=None, metavar='I/N',
+                        help='只處理第 I 個分片（共 N 片，依行號輪流分配）；需搭配 --seed 才能與單機結果一致')
+    parser.add_argument('--workers', type=int, default=1, help='進程數')
+    parser.add_argument('--chunksize', type=int, default=256, help='每個任務包含的句子數')
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+
+    input_format = args.input_format
+    if input_format == 'auto':
+        input_format = 'jsonl' if args.input.endswith(('.jsonl', '.json')) else 'text'
+
+    if args.maker_weight:
+        makers, maker_weight = parse_maker_weight(args.maker_weight)
+        pipeline = Pipeline(makers=makers, maker_weight=maker_weight)
+    else:
+        pipeline = Pipeline()
+
+    output_format = args.output_format
+    if output_format == 'auto':
+        if args.output.endswith('.parquet'):
+            output_format = 'parquet'
+        elif args.output.endswith(('.arrow', '.feather')):
+            output_format = 'arrow'
+        else:
+            output_format = 'jsonl'
+
+    fin = sys.stdin if args.input == '-' else open(args.input, encoding='utf-8')
+    if output_format == 'jsonl':
+        fout = sys.stdout if args.output == '-' else open(args.output, 'w', encoding='utf-8')
+    else:
+        if args.output == '-':
+            raise ValueError(f"{output_format} output requires --output path")
+        fout = ColumnarWriter(args.output, format=output_format)
+
+    failed = 0
+    try:
+        results = pipeline.imap(
+            read_sentences(fin, input_format, args.text_field),
+            workers=args.workers,
+            chunksize=args.chunksize,
+            error_per_sent=args.error_per_sent,
+            no_change_on_gen_fail=args.no_change_on_gen_fail,
+            verbose=False,
+            seed=args.seed,
+            shard=args.shard,
+            fast_record=True
+        )
+        for result in results:
+            if isinstance(result, Exception):
+                failed += 1
+                continue
+            if output_format == 'jsonl':
+                fout.write(result.json(ensure_ascii=False) + '\n')
+            else:
+                fout.write(result)
+    finally:
+        if fin is not sys.stdin:
+            fin.close()
+        if fout is not sys.stdout:
+            fout.close()
+
+    if failed > 0:
+        logger.warning(f"{failed} sentences failed to generate")
+
+
+if __name__ == '__main__':
+    main()
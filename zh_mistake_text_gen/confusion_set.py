@@ -0,0 +1,185 @@
+import argparse
+import mmap
+import struct
+import sys
+from array import array
+from .resource import get_resource
+
+MAGIC = b'ZMCS'
+VERSION = 1
+TABLES = ('same', 'similar', 'similar_plus')
+
+# magic, version, level, limit_k, 表數量
+_HEADER = struct.Struct('<4sIIII')
+# 每張表: key 空間大小（最大 codepoint + 1）、候選字總數
+_TABLE_HEADER = struct.Struct('<II')
+
+
+def _to_le(arr):
+    if sys.byteorder == 'big':
+        arr = array(arr.typecode, arr)
+        arr.byteswap()
+    return arr
+
+
+def _single_chars(words, exclude):
+    return sorted(set(w for w in words if len(w) == 1 and w != exclude))
+
+
+def _collect_candidates(p2w, level, limit_k):
+    high_freq_zh_char_set = get_resource('high_freq_zh_char_set')
+    similar_han_cache = {}
+    tables = {name: {} for name in TABLES}
+
+    for uni in p2w.uni2cns_map.keys():
+        try:
+            char = p2w._uni2word(uni)
+            han = p2w.to_han(char)
+        except Exception:
+            continue
+        if len(char) != 1:
+            continue
+
+        for name, find in (('same', p2w.find_same), ('similar', p2w.find_similar)):
+            try:
+                candidates = _single_chars(find(char), char)
+            except Exception:
+                continue
+            if len(candidates) > 0:
+                tables[name][ord(char)] = candidates
+
+        if han not in similar_han_cache:
+            similar_han_cache[han] = p2w._find_similar_han_pronounces(han, level=level)[:limit_k]
+        plus = []
+        for similar_han in similar_han_cache[han]:
+            plus.extend(w for w in p2w.han2word(similar_han) if w in high_freq_zh_char_set)
+        plus = _single_chars(plus, char)
+        if len(plus) > 0:
+            tables['similar_plus'][ord(char)] = plus
+
+    return tables
+
+
+def build_confusion_set(path, p2w=None, level=1, limit_k=10):
+    """
+    離線預先計算每個字的相同音、相似音與編輯距離相似音（高頻字過濾）候選字，寫入二進位檔
+
+    檔案格式：標頭後依序為每張表的 offset 表（以 codepoint 直接索引）與候選字 codepoint 陣列，
+    皆為 little-endian uint32
+
+    :param path: 輸出路徑
+    :param p2w: Optional `Pronounce2Word` 實例
+    :param level: `similar_plus` 使用的發音編輯距離，對應 `PronounceSimilarWordPlusMaker(level=...)`
+    :param limit_k: `similar_plus` 取前幾個相似發音，對應 `PronounceSimilarWordPlusMaker(limit_k=...)`
+    """
+    if p2w is None:
+        from .utils import Pronounce2Word
+        p2w = Pronounce2Word()
+
+    tables = _collect_candidates(p2w, level, limit_k)
+
+    with open(path, 'wb') as f:
+        f.write(_HEADER.pack(MAGIC, VERSION, level, limit_k, len(TABLES)))
+        for name in TABLES:
+            table = tables[name]
+            key_space = max(table.keys(), default=-1) + 1
+            offsets = array('I', [0])
+            values = array('I')
+            for cp in range(key_space):
+                values.extend(ord(c) for c in table.get(cp, ()))
+                offsets.append(len(values))
+            f.write(_TABLE_HEADER.pack(key_space, len(values)))
+            f.write(_to_le(offsets).tobytes())
+            f.write(_to_le(values).tobytes())
+
+
+class ConfusionSet():
+    def __init__(self, path):
+        """
+        以 mmap 載入 `build_confusion_set` 產生的檔案，查詢為 O(1)，多進程間共用同一份分頁
+
+        :param path: 檔案路徑
+        """
+        self.path = path
+        self._open()
+
+    def _open(self):
+        with open(self.path, 'rb') as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, self.level, self.limit_k, n_tables = _HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{self.path} is not a confusion set file")
+
+        self._tables = {}
+        pos = _HEADER.size
+        for name in TABLES[:n_tables]:
+            key_space, n_values = _TABLE_HEADER.unpack_from(self._mm, pos)
+            pos += _TABLE_HEADER.size
+            offsets = memoryview(self._mm)[pos:pos + 4 * (key_space + 1)]
+            pos += 4 * (key_space + 1)
+            values_pos = pos
+            pos += 4 * n_values
+            if sys.byteorder == 'big':
+                offsets = _to_le(array('I', offsets))
+            else:
+                offsets = offsets.cast('I')
+            self._tables[name] = (key_space, offsets, values_pos)
+
+    def __getstate__(self):
+        return {'path': self.path}
+
+    def __setstate__(self, state):
+        self.path = state['path']
+        self._open()
+
+    def lookup(self, table, char):
+        """
+        查詢候選字
+
+        :param table: `same`, `similar` 或 `similar_plus`
+        :param char: 單一字元
+        :retrun: 候選字組成的字串，無結果時為空字串
+        :rtype: str
+        """
+        key_space, offsets, values_pos = self._tables[table]
+        cp = ord(char)
+        if cp >= key_space:
+            return ''
+        start = values_pos + 4 * offsets[cp]
+        end = values_pos + 4 * offsets[cp + 1]
+        return self._mm[start:end].decode('utf-32-le')
+
+    def same(self, char):
+        """
+        相同發音候選字
+        """
+        return self.lookup('same', char)
+
+    def similar(self, char):
+        """
+        相似發音（去除聲調）候選字
+        """
+        return self.lookup('similar', char)
+
+    def similar_plus(self, char):
+        """
+        編輯距離相似發音並經高頻字過濾的候選字
+        """
+        return self.lookup('similar_plus', char)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='python -m zh_mistake_text_gen.confusion_set',
+        description='預先編譯字元替換用的混淆集'
+    )
+    parser.add_argument('output', help='輸出檔案')
+    parser.add_argument('--level', type=int, default=1)
+    parser.add_argument('--limit-k', type=int, default=10)
+    args = parser.parse_args(argv)
+    build_confusion_set(args.output, level=args.level, limit_k=args.limit_k)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,65 +1,240 @@
-import random
-import jieba
 from abc import ABC
-from opencc import OpenCC
+from functools import cached_property
 from typing import Any
-import os
-import py_chinese_pronounce
-from .utils import Pronounce2Word,is_mistake_happend_on_disable_words
-from .data_model import NoiseCorpus
+from . import utils
+from .utils import Pronounce2Word, is_mistake_happend_on_disable_words, is_mistake_happend_on_disable_edit
+from .data_model import NoiseCorpus, NoiseRecord
 from .exception import *
+from .resource import get_resource, high_freq_zh_char_path
+from .analysis import analyze
+from .sampling import WeightedChoice, current_rng
 
-high_freq_zh_char_path = os.path.join(
-    os.path.dirname(__file__),
-    'high_freq_zh_char.txt'
-)
+# 依定義順序登錄的內建 maker，作為 `Pipeline()` 的預設組合
+_default_maker_classes = []
+
+
+def _overlaps(start, end, exclude):
+    # 兩段重疊，或插入點落在另一段內部；相鄰不算重疊，但同一插入點只能插入一次
+    return any((start < e and s < end) or start == end == s == e for s, e in exclude)
+
+
+def _occupied_span(data):
+    """
+    編輯在原句中佔用的 `(start, end)` 區段
+
+    插入的片段與插入點前後的原文相同時（可連續重複），一併佔用這些原文，
+    避免其中之一被其他編輯刪除後，合併的結果與原句相同
+    """
+    start = data.incorrect_start_at
+    end = start + len(data.correct_span)
+    if start == end and data.span:
+        n = len(data.span)
+        while start >= n and data.correct[start-n:start] == data.span:
+            start -= n
+        while data.correct[end:end+n] == data.span:
+            end += n
+    return start, end
+
+
+def default_maker_classes():
+    """
+    `Pipeline` 未指定 `makers` 時使用的 maker 類別
+
+    :rtype: list[type]
+    """
+    return list(_default_maker_classes)
 
 
 class BaseDataMaker(ABC):
     """
     抽像基類
 
+    子類可以直接實作 `make`，或是實作 `edit_at` 並依需要覆寫 `_positions`、`_feasible`，
+    由預設的 `make` 只在可行的位置中抽樣
+
     :meta private:
     """
 
+    def __init_subclass__(cls, default=True, **kwargs):
+        super().__init_subclass__(**kwargs)
+        if default and cls.__module__ == __name__ and not cls.__name__.startswith('_'):
+            _default_maker_classes.append(cls)
+
     def __init__(self, *args, **kwargs) -> None:
-        self.t2s = OpenCC('t2s.json').convert
         self.setup()
 
+    def __getstate__(self):
+        # OpenCC 與 Pronounce2Word 無法序列化，於子進程中第一次使用時重新建立
+        state = self.__dict__.copy()
+        state.pop('t2s', None)
+        state.pop('t2s_char', None)
+        if '_p2w' in state:
+            state['_p2w'] = None
+        return state
+
+    @cached_property
+    def t2s(self):
+        """
+        繁轉簡函數，第一次使用時才載入 OpenCC
+        """
+        return get_resource('t2s').convert
+
+    @cached_property
+    def t2s_char(self):
+        """
+        逐字繁轉簡函數，結果以字為單位快取
+        """
+        return get_resource('t2s_char')
+
+    @property
+    def p2w(self):
+        """
+        `Pronounce2Word` 實例，未在建構時指定則於第一次使用時載入共用實例
+        """
+        if self._p2w is None:
+            self._p2w = Pronounce2Word()
+        return self._p2w
+
+    @p2w.setter
+    def p2w(self, p2w):
+        self._p2w = p2w
+
     def setup(self):
         """
         Do something if needed
         """
         pass
 
-    def make(self, x):
+    def _positions(self, x):
+        """
+        所有可能的編輯位置，預設為每個字元
+        """
+        return range(len(x))
+
+    def _feasible(self, x, position):
+        """
+        低成本檢查該位置是否可能編輯成功，預設排除禁用字
+        """
+        return x[position] not in utils.disable_words
+
+    def _span(self, x, position):
+        """
+        在該位置編輯時會替換的 `(start, end)` 字元區段，插入時 `start == end`
+        """
+        return position, position+1
+
+    def _free(self, x, position, exclude):
+        return not exclude or not _overlaps(*self._span(x, position), exclude)
+
+    def candidates(self, x, exclude=None):
+        """
+        列出句子中可編輯的位置
+
+        :param x: 句子
+        :param exclude: Optional 已被其他編輯佔用的 `(start, end)` 區段，與其重疊的位置不列出
+        :retrun: 可傳給 `edit_at` 的位置
+        :rtype: list[int]
+        """
+        return [p for p in self._positions(x) if self._free(x, p, exclude) and self._feasible(x, p)]
+
+    def _sample_position(self, x, exclude=None):
+        # 依隨機順序檢查，回傳第一個可行位置；分佈等同於在 `candidates` 中均勻抽樣
+        positions = list(self._positions(x))
+        current_rng().shuffle(positions)
+        for position in positions:
+            if self._free(x, position, exclude) and self._feasible(x, position):
+                return position
+        raise NoCandidateError(f"{self.__class__.__name__} has no candidate position")
+
+    def edit_at(self, x, position):
+        """
+        在指定位置產生錯誤
+
+        :param x: 句子
+        :param position: `candidates` 中的位置
+        :rtype: NoiseCorpus
+        """
         raise NotImplementedError
 
-    def __call__(self, *args: Any, **kwargs: Any):
-        data = self.make(*args, **kwargs)
+    def make(self, x, exclude=None):
+        return self.edit_at(x, self._sample_position(x, exclude))
+
+    def _edit(self, x, start, end, replacement):
+        """
+        將 `x[start:end]` 替換為 `replacement`，並記錄編輯位置
+        """
+        x = str(x)
+        return NoiseRecord(
+            correct=x,
+            incorrect=x[:start] + replacement + x[end:],
+            incorrect_start_at=start,
+            incorrect_end_at=start + len(replacement),
+            span=replacement,
+            correct_span=x[start:end]
+        )
+
+    def _make_record(self, *args: Any, exclude=None, **kwargs: Any) -> NoiseRecord:
+        """
+        產生並驗證一筆資料，回傳不經 pydantic 驗證的 `NoiseRecord`
+
+        :param exclude: Optional 已被其他編輯佔用的 `(start, end)` 區段，只在不重疊的位置編輯
+        """
+        if exclude and type(self).make is BaseDataMaker.make:
+            kwargs['exclude'] = exclude
+        return self._check_record(self.make(*args, **kwargs), exclude)
+
+    def _check_record(self, data, exclude=None):
+        """
+        驗證 `make` 或 `edit_at` 的結果，不合格時拋出例外
+
+        :param exclude: Optional 同 `_make_record`
+        :rtype: NoiseRecord
+        """
+        if isinstance(data, NoiseCorpus):
+            data = NoiseRecord.from_model(data)
         data.type = self.__class__.__name__
 
-        if self.t2s(data.correct) == self.t2s(data.incorrect):
+        # 未回報編輯位置的結果無法檢查，由呼叫端處理
+        if exclude and data.correct_span is not None:
+            if _overlaps(*_occupied_span(data), exclude):
+                raise ZeorSearchResultsError('edit overlaps another edit')
+
+        if data.correct_span is not None:
+            # 只比較被編輯的片段，不需轉換整句
+            t2s_same = self.t2s_char(data.correct_span) == self.t2s_char(data.span)
+        else:
+            t2s_same = self.t2s(data.correct) == self.t2s(data.incorrect)
+        if t2s_same:
             raise TraditionalSimplifiedSameError('After t2s compare is same')
-        
-        if is_mistake_happend_on_disable_words(data.correct,data.incorrect):
+
+        if data.correct_span is not None:
+            # maker 已回報編輯位置，只需檢查該段
+            on_disable_words = is_mistake_happend_on_disable_edit(
+                data.correct, data.incorrect, data.incorrect_start_at,
+                data.incorrect_start_at + len(data.correct_span), data.incorrect_end_at)
+        else:
+            on_disable_words = is_mistake_happend_on_disable_words(data.correct, data.incorrect)
+        if on_disable_words:
             raise MistakeTextHappendOnDisableWordsError()
 
         return data
 
+    def __call__(self, *args: Any, **kwargs: Any) -> NoiseCorpus:
+        return self._make_record(*args, **kwargs).to_model()
+
 
-class NoChangeMaker(BaseDataMaker):
+class NoChangeMaker(BaseDataMaker, default=False):
     """
     保持不變換
     """
 
     def make(self, x):
-        return NoiseCorpus(
-            correct=x,
-            incorrect=x,
+        return NoiseRecord(
+            correct=str(x),
+            incorrect=str(x),
         )
 
-    def __call__(self, *args: Any, **kwargs: Any) -> NoiseCorpus:
+    def _make_record(self, *args: Any, exclude=None, **kwargs: Any) -> NoiseRecord:
         data = self.make(*args, **kwargs)
         data.type = self.__class__.__name__
         return data
@@ -70,17 +245,8 @@ class MissingWordMaker(BaseDataMaker):
     隨機缺字
     """
 
-    def make(self, x):
-        correct = x[:]
-        rand = random.randint(0, len(x)-1)
-        x = list(x)
-        span = x.pop(rand)
-        x = ''.join(x)
-
-        return NoiseCorpus(
-            correct=correct,
-            incorrect=x,
-        )
+    def edit_at(self, x, position):
+        return self._edit(x, position, position+1, '')
 
 
 class MissingVocabMaker(BaseDataMaker):
@@ -88,16 +254,19 @@ class MissingVocabMaker(BaseDataMaker):
     隨機缺詞
     """
 
-    def make(self, x):
-        correct = x[:]
-        seg_list = list(jieba.cut(x))
-        rand = random.randint(0, len(seg_list)-1)
-        span = seg_list.pop(rand)
-
-        return NoiseCorpus(
-            correct=correct,
-            incorrect=''.join(seg_list)
-        )
+    def _positions(self, x):
+        return range(len(analyze(x).tokens))
+
+    def _span(self, x, position):
+        return analyze(x).token_offsets[position]
+
+    def _feasible(self, x, position):
+        return analyze(x).tokens[position] not in utils.disable_words
+
+    def edit_at(self, x, position):
+        x = analyze(x)
+        start, end = x.token_offsets[position]
+        return self._edit(x, start, end, '')
 
 
 class PronounceSimilarWordMaker(BaseDataMaker):
@@ -105,35 +274,40 @@ class PronounceSimilarWordMaker(BaseDataMaker):
     去除聲符找相似
     """
 
-    def __init__(self, *args, p2w=None, **kwargs):
+    def __init__(self, *args, p2w=None, confusion_set=None, **kwargs):
+        """
+        :param p2w: Optional `Pronounce2Word` 實例
+        :param confusion_set: Optional 預先編譯的 `ConfusionSet`，有提供時以查表取代 `p2w` 搜尋
+        """
         super().__init__()
-        if p2w is not None:
-            self.p2w = p2w
-        else:
-            self.p2w = Pronounce2Word()
-
-    def make(self, x):
-        correct = x[:]
-        rand = random.randint(0, len(x)-1)
-
-        replace_word = x[rand]
+        self.confusion_set = confusion_set
+        self._p2w = p2w
 
+    def _find_similar(self, word):
+        if self.confusion_set is not None:
+            return self.confusion_set.similar(word)
         try:
-            similar_vocab = self.p2w.find_similar(replace_word)
+            # p2w 的結果來自 set，排序後抽樣才不受 hash 隨機化影響
+            return sorted(self.p2w.find_similar(word))
         except Exception as exc:
             raise FindOrConvertError('p2w find similar error') from exc
 
-        rand_for_select_similar_word = random.randint(0, len(similar_vocab)-1)
-        select_similar_word = similar_vocab[rand_for_select_similar_word]
+    def _feasible(self, x, position):
+        if not super()._feasible(x, position):
+            return False
+        try:
+            return len(self._find_similar(x[position])) > 0
+        except FindOrConvertError:
+            return False
 
-        x = [c for c in x]
-        x[rand] = select_similar_word
-        x = ''.join(x)
+    def edit_at(self, x, position):
+        similar_vocab = self._find_similar(x[position])
+        if len(similar_vocab) == 0:
+            raise ZeorSearchResultsError('similar_vocab not found')
 
-        return NoiseCorpus(
-            correct=correct,
-            incorrect=x
-        )
+        select_similar_word = current_rng().choice(similar_vocab)
+
+        return self._edit(x, position, position+1, select_similar_word)
 
 
 class PronounceSimilarWordPlusMaker(BaseDataMaker):
@@ -141,27 +315,45 @@ class PronounceSimilarWordPlusMaker(BaseDataMaker):
     編輯距離找相似+高頻字
     """
 
-    def __init__(self, *args, p2w=None, level=1, limit_k=10, **kwargs):
+    def __init__(self, *args, p2w=None, level=1, limit_k=10, confusion_set=None, **kwargs):
+        """
+        :param p2w: Optional `Pronounce2Word` 實例
+        :param level: 發音編輯距離
+        :param limit_k: 取前幾個相似發音
+        :param confusion_set: Optional 預先編譯的 `ConfusionSet`，其 `level`、`limit_k` 需與本 maker 相同
+        """
         super().__init__()
         self.level = level
         self.limit_k = limit_k
-        if p2w is not None:
-            self.p2w = p2w
-        else:
-            self.p2w = Pronounce2Word()
+        if confusion_set is not None and (confusion_set.level, confusion_set.limit_k) != (level, limit_k):
+            raise ValueError(
+                f"confusion_set is built with level={confusion_set.level}, limit_k={confusion_set.limit_k}")
+        self.confusion_set = confusion_set
+        self._p2w = p2w
 
     def setup(self):
-        self.high_freq_zh_char = []
-        f = open(high_freq_zh_char_path, encoding='utf-8')
-        for line in f.readlines():
-            self.high_freq_zh_char.append(line.replace('\n', ''))
-        f.close()
+        self.high_freq_zh_char = get_resource('high_freq_zh_char')
+        self.high_freq_zh_char_set = get_resource('high_freq_zh_char_set')
+
+    def _feasible(self, x, position):
+        if not super()._feasible(x, position):
+            return False
+        if self.confusion_set is not None:
+            return len(self.confusion_set.similar_plus(x[position])) > 0
+        try:
+            self.p2w.to_han(x[position])
+        except Exception:
+            return False
+        return True
 
-    def make(self, x):
-        correct = x[:]
-        rand = random.randint(0, len(x)-1)
+    def edit_at(self, x, position):
+        replace_word = x[position]
 
-        replace_word = x[rand]
+        if self.confusion_set is not None:
+            new_words = self.confusion_set.similar_plus(replace_word)
+            if len(new_words) == 0:
+                raise ZeorSearchResultsError("No high freq char in string")
+            return self._edit(x, position, position+1, current_rng().choice(new_words))
 
         try:
             new_han_pronounces = self.p2w._find_similar_han_pronounces(
@@ -169,33 +361,22 @@ class PronounceSimilarWordPlusMaker(BaseDataMaker):
         except Exception as exc:
             raise FindOrConvertError from exc
 
-        new_han_pronounces = new_han_pronounces[:self.limit_k]
-        random.shuffle(new_han_pronounces)
-        new_han_pronounce = new_han_pronounces[0]
+        new_han_pronounce = current_rng().choice(new_han_pronounces[:self.limit_k])
         new_words = self.p2w.han2word(new_han_pronounce)
-        new_words = list(
-            filter(lambda x: x in self.high_freq_zh_char, new_words))
+        new_words = sorted(
+            filter(lambda x: x in self.high_freq_zh_char_set, new_words))
 
         if len(new_words) == 0:
             raise ZeorSearchResultsError("No high freq char in string")
 
-        random.shuffle(new_words)
-        new_word = new_words[0]
+        new_word = current_rng().choice(new_words)
 
         if new_word == replace_word:
             raise ZeorSearchResultsError("same word")
 
-        rand_for_select_similar_word = random.randint(0, len(new_word)-1)
-        select_similar_word = new_word[rand_for_select_similar_word]
-
-        x = [c for c in x]
-        x[rand] = select_similar_word
-        x = ''.join(x)
+        select_similar_word = current_rng().choice(new_word)
 
-        return NoiseCorpus(
-            correct=correct,
-            incorrect=x
-        )
+        return self._edit(x, position, position+1, select_similar_word)
 
 
 class PronounceSameWordMaker(BaseDataMaker):
@@ -203,149 +384,127 @@ class PronounceSameWordMaker(BaseDataMaker):
     相同發音字替換
     """
 
-    def __init__(self, *args, p2w=None, **kwargs):
+    def __init__(self, *args, p2w=None, confusion_set=None, **kwargs):
+        """
+        :param p2w: Optional `Pronounce2Word` 實例
+        :param confusion_set: Optional 預先編譯的 `ConfusionSet`，有提供時以查表取代 `p2w` 搜尋
+        """
         super().__init__()
-        if p2w is not None:
-            self.p2w = p2w
-        else:
-            self.p2w = Pronounce2Word()
-
-    def make(self, x):
-        correct = x[:]
-        rand = random.randint(0, len(x)-1)
-
-        replace_word = x[rand]
+        self.confusion_set = confusion_set
+        self._p2w = p2w
 
+    def _find_same(self, word):
+        if self.confusion_set is not None:
+            return self.confusion_set.same(word)
         try:
-            similar_vocab = self.p2w.find_same(replace_word)
+            return sorted(self.p2w.find_same(word))
         except Exception as exc:
             raise FindOrConvertError from exc
 
+    def _feasible(self, x, position):
+        if not super()._feasible(x, position):
+            return False
+        try:
+            return len(self._find_same(x[position])) > 0
+        except FindOrConvertError:
+            return False
+
+    def edit_at(self, x, position):
+        similar_vocab = self._find_same(x[position])
         if len(similar_vocab) == 0:
             raise ZeorSearchResultsError('similar_vocab not found')
 
-        rand_for_select_similar_word = random.randint(0, len(similar_vocab)-1)
-        select_similar_word = similar_vocab[rand_for_select_similar_word]
-
-        x = [c for c in x]
-        x[rand] = select_similar_word
-        x = ''.join(x)
+        select_similar_word = current_rng().choice(similar_vocab)
 
-        return NoiseCorpus(
-            correct=correct,
-            incorrect=x
-        )
+        return self._edit(x, position, position+1, select_similar_word)
 
 
-class PronounceSimilarVocabMaker(BaseDataMaker):
+class _VocabReplaceMaker(BaseDataMaker):
     """
-    相似發聲詞彙替換
+    以詞為單位替換的 maker，子類實作 `_find` 回傳候選詞
+
+    :meta private:
     """
 
     def __init__(self, *args, p2w=None, **kwargs):
         super().__init__()
-        if p2w is not None:
-            self.p2w = p2w
-        else:
-            self.p2w = Pronounce2Word()
+        self._p2w = p2w
 
-    def make(self, x):
-        correct = x[:]
-        seg_list = list(jieba.cut(x))
-        rand = random.randint(0, len(seg_list)-1)
-        span = seg_list[:].pop(rand)
-
-        try:
-            similar_pronounce_spans = self.p2w.find_similar_vocab(span)
-        except Exception as exc:
-            raise FindOrConvertError from exc
-        if len(similar_pronounce_spans) == 0:
-            raise ZeorSearchResultsError('similar_pronounce_spans not found')
-        random.shuffle(similar_pronounce_spans)
-        similar_pronounce_span = similar_pronounce_spans[0]
-
-        seg_list[rand] = similar_pronounce_span
-        x = seg_list
-        x = ''.join(x)
+    def _find(self, span):
+        raise NotImplementedError
 
-        return NoiseCorpus(
-            correct=correct,
-            incorrect=x
-        )
+    def _positions(self, x):
+        return range(len(analyze(x).tokens))
 
+    def _span(self, x, position):
+        return analyze(x).token_offsets[position]
 
-class PronounceSimilarVocabPlusMaker(BaseDataMaker):
-    def __init__(self, *args, p2w=None, level=1, **kwargs):
-        super().__init__()
-        self.level = level
-        if p2w is not None:
-            self.p2w = p2w
-        else:
-            self.p2w = Pronounce2Word()
+    def _feasible(self, x, position):
+        span = analyze(x).tokens[position]
+        if span in utils.disable_words:
+            return False
+        try:
+            return len(self._find(span)) > 0
+        except Exception:
+            return False
 
-    def make(self, x):
-        correct = x[:]
-        seg_list = list(jieba.cut(x))
-        rand = random.randint(0, len(seg_list)-1)
-        span = seg_list[:].pop(rand)
+    def edit_at(self, x, position):
+        x = analyze(x)
+        span = x.tokens[position]
 
         try:
-            similar_pronounce_spans = self.p2w.find_similar_vocab_level(
-                span, level=self.level)
+            similar_pronounce_spans = self._find(span)
         except Exception as exc:
             raise FindOrConvertError from exc
         if len(similar_pronounce_spans) == 0:
             raise ZeorSearchResultsError('similar_pronounce_spans not found')
-        random.shuffle(similar_pronounce_spans)
-        similar_pronounce_span = similar_pronounce_spans[0]
+        similar_pronounce_span = current_rng().choice(sorted(similar_pronounce_spans))
 
-        seg_list[rand] = similar_pronounce_span
-        x = seg_list
-        x = ''.join(x)
+        start, end = x.token_offsets[position]
+        return self._edit(x, start, end, similar_pronounce_span)
 
-        return NoiseCorpus(
-            correct=correct,
-            incorrect=x
-        )
+
+class PronounceSimilarVocabMaker(_VocabReplaceMaker):
+    """
+    相似發聲詞彙替換
+    """
+
+    def _find(self, span):
+        return self.p2w.find_similar_vocab(span)
 
 
-class PronounceSameVocabMaker(BaseDataMaker):
+class PronounceSimilarVocabPlusMaker(_VocabReplaceMaker):
     """
-    相同發聲詞彙替換
+    編輯距離找相似發聲詞彙替換
     """
 
-    def __init__(self, *args, p2w=None, **kwargs):
-        super().__init__()
-        if p2w is not None:
-            self.p2w = p2w
-        else:
-            self.p2w = Pronounce2Word()
+    def __init__(self, *args, p2w=None, level=1, **kwargs):
+        super().__init__(p2w=p2w)
+        self.level = level
 
-    def make(self, x):
-        correct = x[:]
-        seg_list = list(jieba.cut(x))
-        rand = random.randint(0, len(seg_list)-1)
-        span = seg_list[:].pop(rand)
+    def _find(self, span):
+        return self.p2w.find_similar_vocab_level(span, level=self.level)
 
+    def _feasible(self, x, position):
+        # 編輯距離搜尋成本高，只檢查每個字都有發音
+        span = analyze(x).tokens[position]
+        if span in utils.disable_words:
+            return False
         try:
-            similar_pronounce_spans = self.p2w.find_same_vocab(span)
-        except Exception as exc:
-            raise FindOrConvertError from exc
+            for word in span:
+                self.p2w.to_han(word)
+        except Exception:
+            return False
+        return True
 
-        if len(similar_pronounce_spans) == 0:
-            raise ZeorSearchResultsError('similar_pronounce_spans not found')
-        random.shuffle(similar_pronounce_spans)
-        similar_pronounce_span = similar_pronounce_spans[0]
 
-        # logger.debug(f"{rand} {seg_list}")
-        seg_list[rand] = similar_pronounce_span
-        x = seg_list
-        x = ''.join(x)
+class PronounceSameVocabMaker(_VocabReplaceMaker):
+    """
+    相同發聲詞彙替換
+    """
 
-        return NoiseCorpus(
-            correct=correct,
-            incorrect=x
-        )
+    def _find(self, span):
+        return self.p2w.find_same_vocab(span)
 
 
 class RedundantWordMaker(BaseDataMaker):
@@ -355,22 +514,23 @@ class RedundantWordMaker(BaseDataMaker):
 
     def __init__(self, *args, p2w=None, **kwargs):
         super().__init__()
-        if p2w is not None:
-            self.p2w = p2w
-        else:
-            self.p2w = Pronounce2Word()
+        self._p2w = p2w
 
-    def make(self, x):
-        correct = x[:]
-        rand = random.randint(0, len(x)-1)
-        x = list(x)
-        span = x[rand-1]
-        x.insert(rand, x[rand-1])
-        x = ''.join(x)
-        return NoiseCorpus(
-            correct=correct,
-            incorrect=x
-        )
+    def _span(self, x, position):
+        # 同 `_occupied_span`，佔用插入點前後與被複製的字相同的連續字元
+        ch = x[position-1]
+        start, end = position, position
+        while start > 0 and x[start-1] == ch:
+            start -= 1
+        while end < len(x) and x[end] == ch:
+            end += 1
+        return start, end
+
+    def _feasible(self, x, position):
+        return x[position-1] not in utils.disable_words
+
+    def edit_at(self, x, position):
+        return self._edit(x, position, position, x[position-1])
 
 
 class MistakWordMaker(BaseDataMaker):
@@ -380,32 +540,19 @@ class MistakWordMaker(BaseDataMaker):
 
     def __init__(self, *args, p2w=None, **kwargs):
         super().__init__()
-        if p2w is not None:
-            self.p2w = p2w
-        else:
-            self.p2w = Pronounce2Word()
+        self._p2w = p2w
+        self._ch_unis = None
 
-    def make(self, x):
-        ch_unis = list(self.p2w.uni2cns_map.keys())
-        random_ch_uni_index = random.randint(0, len(ch_unis))
+    def edit_at(self, x, position):
+        if self._ch_unis is None:
+            self._ch_unis = tuple(self.p2w.uni2cns_map.keys())
 
         try:
-            random_ch = self.p2w._uni2word(ch_unis[random_ch_uni_index])
+            random_ch = self.p2w._uni2word(current_rng().choice(self._ch_unis))
         except Exception as exc:
             raise FindOrConvertError("p2w._uni2word out of range") from exc
 
-        correct = x[:]
-        rand = random.randint(0, len(x)-1)
-        span = random_ch
-
-        x = list(x)
-        x[rand] = span
-        x = ''.join(x)
-
-        return NoiseCorpus(
-            correct=correct,
-            incorrect=x
-        )
+        return self._edit(x, position, position+1, random_ch)
 
 
 class MistakeWordHighFreqMaker(BaseDataMaker):
@@ -413,29 +560,25 @@ class MistakeWordHighFreqMaker(BaseDataMaker):
     隨機替換高頻字用字
     """
 
-    def setup(self):
-        self.high_freq_zh_char = []
-        f = open(high_freq_zh_char_path, encoding='utf-8')
-        for line in f.readlines():
-            self.high_freq_zh_char.append(line.replace('\n', ''))
-        f.close()
-
-    def make(self, x):
-        random_ch_uni_index = random.randint(0, len(self.high_freq_zh_char)-1)
-        random_ch = self.high_freq_zh_char[random_ch_uni_index]
+    def __init__(self, *args, char_weights=None, **kwargs):
+        """
+        :param char_weights: Optional 高頻字的抽樣權重，例如字頻 `{"的": 100, ...}`；未列出的字權重為 0，
+            未提供時均勻抽樣
+        :type char_weights: dict[str, float]
+        """
+        super().__init__()
+        weights = None
+        if char_weights is not None:
+            weights = [char_weights.get(c, 0) for c in self.high_freq_zh_char]
+        self._char_sampler = WeightedChoice(self.high_freq_zh_char, weights)
 
-        correct = x[:]
-        rand = random.randint(0, len(x)-1)
-        span = random_ch
+    def setup(self):
+        self.high_freq_zh_char = get_resource('high_freq_zh_char')
+        self.high_freq_zh_char_set = get_resource('high_freq_zh_char_set')
 
-        x = list(x)
-        x[rand] = span
-        x = ''.join(x)
-
-        return NoiseCorpus(
-            correct=correct,
-            incorrect=x
-        )
+    def edit_at(self, x, position):
+        random_ch = self._char_sampler.choice()
+        return self._edit(x, position, position+1, random_ch)
 
 
 class MissingWordHighFreqMaker(BaseDataMaker):
@@ -444,34 +587,14 @@ class MissingWordHighFreqMaker(BaseDataMaker):
     """
 
     def setup(self):
-        self.high_freq_zh_char = []
-        f = open(high_freq_zh_char_path, encoding='utf-8')
-        for line in f.readlines():
-            self.high_freq_zh_char.append(line.replace('\n', ''))
-        f.close()
-
-    def make(self, x):
-        high_freq_char_list = []
-        for char_x in list(x):
-            if char_x in self.high_freq_zh_char:
-                high_freq_char_list.append(char_x)
-
-        if len(high_freq_char_list) == 0:
-            raise ZeorSearchResultsError("No high freq char in string")
+        self.high_freq_zh_char = get_resource('high_freq_zh_char')
+        self.high_freq_zh_char_set = get_resource('high_freq_zh_char_set')
 
-        random_ch = random.choice(high_freq_char_list)
+    def _feasible(self, x, position):
+        return x[position] in self.high_freq_zh_char_set and super()._feasible(x, position)
 
-        correct = x[:]
-        x = list(x)
-
-        rand = x.index(random_ch)
-        span = x.pop(rand)
-        x = ''.join(x)
-
-        return NoiseCorpus(
-            correct=correct,
-            incorrect=x
-        )
+    def edit_at(self, x, position):
+        return self._edit(x, position, position+1, '')
 
 
 class RandomInsertVacabMaker(BaseDataMaker):
@@ -479,23 +602,20 @@ class RandomInsertVacabMaker(BaseDataMaker):
     隨機插入詞彙
     """
 
-    def setup(self):
-        sc_dict_path = os.path.join(
-            os.path.dirname(py_chinese_pronounce.__file__),
-            'sc-dict.txt'
-        )
-        self.sc_dict = open(sc_dict_path, 'r', encoding='utf-8').read().split()
+    @cached_property
+    def sc_dict(self):
+        # 詞表較大，第一次插入時才載入
+        return get_resource('sc_dict')
 
-    def make(self, x):
-        correct = x[:]
-        x = x[:]
-        random_vocab = self.sc_dict[random.randint(0, len(self.sc_dict)-1)]
-        rand_ins_postion = random.randint(0, len(x))
-        x = list(x)
-        x.insert(rand_ins_postion, random_vocab)
-        x = ''.join(x)
-
-        return NoiseCorpus(
-            correct=correct,
-            incorrect=x
-        )
+    def _positions(self, x):
+        return range(len(x)+1)
+
+    def _span(self, x, position):
+        return position, position
+
+    def _feasible(self, x, position):
+        return True
+
+    def edit_at(self, x, position):
+        random_vocab = current_rng().choice(self.sc_dict)
+        return self._edit(x, position, position, random_vocab)
@@ -1,11 +1,68 @@
+import json
 from typing import Optional
 from pydantic import BaseModel
 
 class NoiseCorpus(BaseModel):
     """
     output format
+
+    `incorrect_start_at`、`incorrect_end_at` 為錯誤片段 `span` 在 `incorrect` 中的位置，
+    `correct_span` 為被替換掉的原文片段；無法得知編輯位置時為 `None`
     """
     type: Optional[str] = None
     correct: str
     incorrect: str
-    
\ No newline at end of file
+    incorrect_start_at: Optional[int] = None
+    incorrect_end_at: Optional[int] = None
+    span: Optional[str] = None
+    correct_span: Optional[str] = None
+
+
+NOISE_CORPUS_FIELDS = tuple(NoiseCorpus.__fields__.keys())
+
+
+class NoiseRecord():
+    """
+    與 `NoiseCorpus` 欄位相同的輕量紀錄，不做驗證，供大量生成時使用
+    """
+    __slots__ = NOISE_CORPUS_FIELDS
+
+    def __init__(self, correct, incorrect, type=None, incorrect_start_at=None,
+                 incorrect_end_at=None, span=None, correct_span=None):
+        self.type = type
+        self.correct = correct
+        self.incorrect = incorrect
+        self.incorrect_start_at = incorrect_start_at
+        self.incorrect_end_at = incorrect_end_at
+        self.span = span
+        self.correct_span = correct_span
+
+    @classmethod
+    def from_model(cls, model):
+        return cls(**model.dict())
+
+    def to_model(self):
+        """
+        :rtype: NoiseCorpus
+        """
+        return NoiseCorpus.construct(**self.dict())
+
+    def to_tuple(self):
+        return tuple(getattr(self, name) for name in NOISE_CORPUS_FIELDS)
+
+    def dict(self):
+        return {name: getattr(self, name) for name in NOISE_CORPUS_FIELDS}
+
+    def json(self, **dumps_kwargs):
+        """
+        輸出與 `NoiseCorpus.json` 相同格式的 JSON
+        """
+        return json.dumps(self.dict(), **dumps_kwargs)
+
+    def __eq__(self, other):
+        if isinstance(other, (NoiseRecord, NoiseCorpus)):
+            return self.dict() == other.dict()
+        return NotImplemented
+
+    def __repr__(self):
+        return f"NoiseRecord({', '.join(f'{k}={v!r}' for k, v in self.dict().items())})"
@@ -0,0 +1,132 @@
+import os
+import queue
+import threading
+from .pipeline import Pipeline, parse_shard
+from .sampling import sample_seed
+
+try:
+    from torch.utils.data import IterableDataset as _IterableDataset
+    from torch.utils.data import get_worker_info
+except ImportError:  # pragma: no cover
+    _IterableDataset = object
+
+    def get_worker_info():
+        return None
+
+# 生產端結束的標記
+_DONE = object()
+
+
+class _ProducerError():
+    # 背景執行緒拋出的例外，與 `skip_failed=False` 時產出的例外實例區分
+    def __init__(self, exc):
+        self.exc = exc
+
+
+class NoiseDataset(_IterableDataset):
+    def __init__(self, sentences, pipeline=None, seed=None, shard=None, prefetch=256,
+                 error_per_sent=1, no_change_on_gen_fail=False, skip_failed=True, fast_record=False):
+        """
+        每次迭代即時生成錯誤句的 iterable dataset，每個 epoch 產生新的錯誤
+
+        安裝 PyTorch 時為 `torch.utils.data.IterableDataset`，可直接交給 `DataLoader`；
+        多個 DataLoader worker 會自動依序號分片，不會重複處理同一句
+
+        :param sentences: 可重複迭代的正確句子，例如 list
+        :param pipeline: Optional `Pipeline` 實例，預設為 `Pipeline()`
+        :param seed: Optional 隨機種子；每一句以 (seed, epoch, 句子序號) 推導自己的亂數，結果與 worker 數無關。
+            未設定時每個 worker 各自取得隨機種子
+        :param shard: Optional `(i, n)` 或 `"i/n"`，分散式訓練時每個節點只處理自己的分片，會再與 DataLoader worker 分片組合
+        :param prefetch: Optional 背景執行緒預先生成的筆數上限，`0` 表示不預取
+        :param skip_failed: Optional 略過生成失敗的句子；關閉時該位置產出例外實例
+        其餘參數同 `Pipeline.__call__`
+        """
+        super().__init__()
+        self.sentences = sentences
+        self.pipeline = Pipeline() if pipeline is None else pipeline
+        self.seed = seed
+        self.shard = None if shard is None else parse_shard(shard)
+        self.prefetch = prefetch
+        self.skip_failed = skip_failed
+        self.call_kwargs = dict(
+            error_per_sent=error_per_sent,
+            no_change_on_gen_fail=no_change_on_gen_fail,
+            verbose=False,
+            fast_record=fast_record
+        )
+        self.epoch = 0
+
+    def set_epoch(self, epoch):
+        """
+        設定目前的 epoch；指定 `seed` 時需在每個 epoch 開始前呼叫，才會產生不同的錯誤
+        """
+        self.epoch = epoch
+
+    def _shard(self):
+        # 結合分散式分片與 DataLoader worker 分片
+        shard_index, num_shards = (0, 1) if self.shard is None else self.shard
+        worker_info = get_worker_info()
+        if worker_info is not None:
+            shard_index = shard_index * worker_info.num_workers + worker_info.id
+            num_shards *= worker_info.num_workers
+        return shard_index, num_shards
+
+    def _epoch_seed(self):
+        if self.seed is None:
+            # fork 出的 worker 共享相同的 `random` 狀態，改用系統亂數避免各 worker 產生相同的錯誤
+            return int.from_bytes(os.urandom(8), 'little')
+        return sample_seed(self.seed, self.epoch)
+
+    def _generate(self):
+        shard_index, num_shards = self._shard()
+        seed = self._epoch_seed()
+        for index, x in enumerate(self.sentences):
+            if index % num_shards != shard_index:
+                continue
+            out, = self.pipeline._call_many([(index, x)], self.call_kwargs, seed)
+            if isinstance(out, Exception) and self.skip_failed:
+                continue
+            yield out
+
+    def __iter__(self):
+        if self.prefetch <= 0:
+            yield from self._generate()
+            return
+
+        buffer = queue.Queue(maxsize=self.prefetch)
+        stop = threading.Event()
+
+        def produce():
+            try:
+                for out in self._generate():
+                    while not stop.is_set():
+                        try:
+                            buffer.put(out, timeout=0.1)
+                            break
+                        except queue.Full:
+                            pass
+                    if stop.is_set():
+                        return
+                item = _DONE
+            except BaseException as e:
+                item = _ProducerError(e)
+            while not stop.is_set():
+                try:
+                    buffer.put(item, timeout=0.1)
+                    return
+                except queue.Full:
+                    pass
+
+        producer = threading.Thread(target=produce, daemon=True)
+        producer.start()
+        try:
+            while True:
+                out = buffer.get()
+                if out is _DONE:
+                    return
+                if isinstance(out, _ProducerError):
+                    raise out.exc
+                yield out
+        finally:
+            stop.set()
+            producer.join()
@@ -0,0 +1,131 @@
+import re
+from .data_model import NoiseRecord
+from .data_maker import NoChangeMaker
+from .exception import ZeorSearchResultsError
+from .sampling import current_rng, use_rng, sample_rng
+
+# 句末標點（可連續出現）後接的右引號、右括號歸入同一句
+_SENTENCE = re.compile(r'.*?(?:[。！？!?；;\n]+|…+|$)[」』”’）)\]]*', re.S)
+
+# 過長的句子優先在這些標點後切開
+_CLAUSE = re.compile(r'.*?(?:[，,、：:]+|$)', re.S)
+
+
+def _split_long(sentence, max_len):
+    piece = ''
+    for clause in _CLAUSE.findall(sentence):
+        if len(piece) + len(clause) > max_len and piece != '':
+            yield piece
+            piece = ''
+        piece += clause
+        while len(piece) > max_len:
+            yield piece[:max_len]
+            piece = piece[max_len:]
+    if piece != '':
+        yield piece
+
+
+def split_sentences(text, max_len=None):
+    """
+    依中文句末標點切句，逐句產出；所有片段依序相接即為原文
+
+    :param text: 段落或文章
+    :param max_len: Optional 超過此長度的句子再依逗號等標點切開，仍過長時直接截斷
+    :rtype: Iterator[str]
+    """
+    for sentence in _SENTENCE.finditer(text):
+        sentence = sentence.group()
+        if sentence == '':
+            continue
+        if max_len is not None and len(sentence) > max_len:
+            yield from _split_long(sentence, max_len)
+        else:
+            yield sentence
+
+
+def _strip(piece):
+    # 前後空白不送進 pipeline，重組時原樣放回
+    core = piece.strip()
+    if core == '':
+        return piece, '', ''
+    start = piece.index(core)
+    return piece[:start], core, piece[start + len(core):]
+
+
+def _noise_document(pipeline, doc, budget, reassemble, max_len, no_change_on_gen_fail, verbose, fast_record):
+    pieces = [_strip(piece) for piece in split_sentences(doc, max_len)]
+    order = [i for i, (_, core, _) in enumerate(pieces) if core != '']
+    current_rng().shuffle(order)
+
+    # 將預算平均分給隨機順序中的句子；失敗的句子不消耗預算，留給後面的句子
+    results = {}
+    remaining = budget
+    for n, i in enumerate(order):
+        if remaining <= 0:
+            break
+        want = -(-remaining // (len(order) - n))
+        try:
+            results[i] = pipeline(pieces[i][1], error_per_sent=want, verbose=verbose, fast_record=True)
+        except ZeorSearchResultsError:
+            continue
+        remaining -= want
+
+    if len(results) == 0 and budget > 0 and not no_change_on_gen_fail:
+        return ZeorSearchResultsError("Data gen fail, no sentence in document can be edited")
+
+    if not reassemble:
+        out = []
+        for i, (_, core, _) in enumerate(pieces):
+            if core == '':
+                continue
+            res = results.get(i)
+            if res is None:
+                res = NoiseRecord(correct=core, incorrect=core, type=NoChangeMaker.__name__)
+            out.append(res if fast_record else res.to_model())
+        return out
+
+    incorrect = []
+    types = []
+    for i, (prefix, core, suffix) in enumerate(pieces):
+        res = results.get(i)
+        if res is not None:
+            core = res.incorrect
+            types.append(res.type)
+        incorrect.append(prefix + core + suffix)
+    res = NoiseRecord(
+        correct=doc,
+        incorrect=''.join(incorrect),
+        type='_'.join(types) if types else NoChangeMaker.__name__
+    )
+    return res if fast_record else res.to_model()
+
+
+def noise_documents(documents, pipeline=None, error_budget=1, reassemble=True, seed=None, max_len=None,
+                    no_change_on_gen_fail=False, verbose=False, fast_record=False):
+    """
+    將段落或文章切句後逐句送進 `Pipeline`，以串流方式逐篇產出；
+    每次呼叫 maker 只處理一句，記憶體用量與文件數量無關
+
+    單篇無法產生任何錯誤時不會中斷，該篇位置改為產出 `ZeorSearchResultsError` 實例
+
+    :param documents: 可迭代的段落或文章
+    :param pipeline: Optional `Pipeline` 實例，預設為 `Pipeline()`
+    :param error_budget: 每篇的錯誤數，或以文件為參數回傳錯誤數的函數；錯誤平均分散在隨機挑選的句子上
+    :param reassemble: Optional 將各句重組回整篇，產出 `type` 以 `_` 連接各錯誤類型、不含編輯位置的結果；
+        關閉時每篇產出各句結果的 list，未編輯的句子類型為 `NoChangeMaker`。預設:`True`
+    :param seed: Optional 隨機種子；每篇以 (seed, 文件序號) 推導自己的亂數
+    :param max_len: Optional 同 `split_sentences`
+    :param no_change_on_gen_fail: 整篇都無法產生錯誤時產出原文而非例外實例
+    :param verbose: 除錯或額外訊息
+    :param fast_record: Optional 產生 `NoiseRecord` 而非 `NoiseCorpus`
+    """
+    if pipeline is None:
+        from .pipeline import Pipeline
+        pipeline = Pipeline()
+
+    for index, doc in enumerate(documents):
+        budget = error_budget(doc) if callable(error_budget) else error_budget
+        rng = None if seed is None else sample_rng(seed, index)
+        with use_rng(rng):
+            yield _noise_document(pipeline, doc, budget, reassemble, max_len,
+                                  no_change_on_gen_fail, verbose, fast_record)
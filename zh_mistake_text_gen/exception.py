@@ -4,6 +4,12 @@ class ZeorSearchResultsError(Exception):
     """
     pass
 
+class NoCandidateError(ZeorSearchResultsError):
+    """
+    句子中沒有可編輯的位置，重試也不會成功
+    """
+    pass
+
 class TraditionalSimplifiedSameError(Exception):
     """
     簡繁轉換後相同
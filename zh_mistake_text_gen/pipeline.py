@@ -1,78 +1,323 @@
 from .data_maker import *
+from .data_maker import _occupied_span
 from .exception import *
-from copy import copy
+from .analysis import analyze
+from .sampling import AliasSampler, current_rng, use_rng, sample_rng
+from .stats import PipelineStats
+from .scheduler import AdaptiveScheduler, sentence_bucket
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
 from loguru import logger
+import asyncio
+import multiprocessing
+import os
+import time
+import weakref
+
+# 子進程內的 pipeline 實例，由 `_init_worker` 設定
+_worker_pipeline = None
+
+# 由 `Pipeline.process_executor` 建立、子進程已載入該 pipeline 的 executor
+_initialized_executors = weakref.WeakKeyDictionary()
+
+
+def _init_worker(pipeline):
+    global _worker_pipeline
+    _worker_pipeline = pipeline
+    if pipeline._stats is not None:
+        # fork 時 pipeline 未經序列化，統計會帶著主進程已累計的次數與 hook；
+        # 重設為與序列化後相同的狀態，避免回傳增量時重複計入
+        pipeline._stats.__setstate__(pipeline._stats.__getstate__())
+    _worker_pipeline._warmup()
+
+
+def _run_chunk(chunk, call_kwargs, seed=None, pipeline=None):
+    if pipeline is None:
+        pipeline = _worker_pipeline
+    out = pipeline._call_many(chunk, call_kwargs, seed)
+    # 統計以增量回傳給主進程合併
+    stats = pipeline._stats
+    return out, None if stats is None else stats.snapshot(reset=True)
+
+
+async def _aiter(iterable):
+    if hasattr(iterable, '__aiter__'):
+        async for x in iterable:
+            yield x
+    else:
+        for x in iterable:
+            yield x
+
+
+def parse_shard(shard):
+    """
+    解析 `"i/n"` 形式的分片設定
+
+    :rtype: tuple[int, int]
+    """
+    if isinstance(shard, str):
+        index, _, num_shards = shard.partition('/')
+        shard = (int(index), int(num_shards))
+    index, num_shards = shard
+    if not 0 <= index < num_shards:
+        raise ValueError(f"invalid shard {index}/{num_shards}")
+    return index, num_shards
+
+
+def _apply_edits(x, edits):
+    # 將 (start, end, 替換片段) 依位置套用到原句
+    pieces = []
+    cursor = 0
+    for start, end, replacement in sorted(edits):
+        pieces.append(x[cursor:start])
+        pieces.append(replacement)
+        cursor = end
+    pieces.append(x[cursor:])
+    return ''.join(pieces)
+
 
 class Pipeline():
-    def __init__(self, makers=None, maker_weight=None):
+    def __init__(self, makers=None, maker_weight=None, lazy=True, instrument=False, stats_hook=None, stats_interval=60.0, adaptive=False):
         """
         管道類用於快速呼叫多個`data_maker`方法
 
         :param makers: Optional 自訂傳入多個`DataMaker`實例
         :param maker_weight: Optional 為每一個 `DataMaker` 設定被選中機率
+        :param lazy: Optional 未設定 `maker_weight` 時，依隨機順序逐一嘗試 maker，成功即停止；
+            輸出分佈與執行全部 maker 後隨機取一相同。預設:`True`
+        :param instrument: Optional 統計各 maker 的呼叫、成功、失敗、重試次數與耗時，以 `stats()` 取得。預設:`False`
+        :param stats_hook: Optional 每隔 `stats_interval` 秒以 `stats()` 的結果呼叫一次；有提供時自動啟用統計
+        :param stats_interval: Optional `stats_hook` 的最短呼叫間隔秒數
+        :param adaptive: Optional 依各 maker 在不同句長、高頻字比例句子上觀察到的成功率挑選 maker，
+            少選常失敗的 maker，同時維持 `maker_weight`（未設定時為均等）的輸出類型比例。預設:`False`
         """
 
         self.maker_weight = maker_weight
         self.makers = makers
+        self.lazy = lazy
+        self._stats = None
+        if instrument or stats_hook is not None:
+            self._stats = PipelineStats(stats_hook, stats_interval)
 
         if makers is None:
-            self.makers = []
-            for g_var_name in copy(globals()):
-                try:
-                    if g_var_name not in [NoChangeMaker.__name__, BaseDataMaker.__name__] and issubclass(globals()[g_var_name], BaseDataMaker):
-                        print("O", g_var_name)
-                        self.makers.append(globals()[g_var_name]())
-                    else:
-                        print("X", g_var_name)
-                except:
-                    print("X", g_var_name)
+            self.makers = [maker_cls() for maker_cls in default_maker_classes()]
 
+        self._maker_sampler = None
         if self.maker_weight != None:
             assert len(self.maker_weight) == len(
                 self.makers), 'While have `maker_weight` must provide maker_weight for each maker'
+            self._maker_sampler = AliasSampler(self.maker_weight)
 
-    def _noraml_call(self, x, k, no_change_on_gen_fail=False, verbose=True, makers=None):
-        out = []
+        self._scheduler = None
+        if adaptive:
+            weights = [1] * len(self.makers) if self.maker_weight is None else self.maker_weight
+            self._scheduler = AdaptiveScheduler(weights)
 
-        if makers is None:
-            makers = self.makers
+    def _try_maker(self, maker, x, verbose=True, exclude=None):
+        """
+        呼叫 maker，失敗時最多重試 5 次；皆失敗或沒有可編輯位置時回傳 `None`
 
-        for maker in makers:
-            retry = 0
+        :param exclude: Optional 傳給 `_make_record`，避開已規劃的編輯區段
+        """
+        if self._stats is not None:
+            return self._try_maker_instrumented(maker, x, verbose, exclude)
+
+        kwargs = {} if exclude is None else {'exclude': exclude}
+        retry = 0
+        while retry < 5:
+            try:
+                return maker._make_record(x, **kwargs)
+            except NoCandidateError as e:
+                if verbose:
+                    logger.warning(f"{x} - {e} - {maker}")
+                return None
+            except Exception as e:
+                retry += 1
+                if verbose:
+                    logger.warning(
+                        f"{x} - {e} - {type(e)} - {maker} retry:{retry}")
+        return None
+
+    def _try_maker_instrumented(self, maker, x, verbose=True, exclude=None):
+        # 與 `_try_maker` 相同，另外記錄統計；分開實作讓未啟用統計時沒有額外成本
+        stats = self._stats.maker(maker)
+        stats.calls += 1
+        start = time.perf_counter_ns()
+        kwargs = {} if exclude is None else {'exclude': exclude}
+        retry = 0
+        try:
             while retry < 5:
                 try:
-                    res = maker(x)
-                    out.append(res)
-                    break
+                    res = maker._make_record(x, **kwargs)
+                    stats.successes += 1
+                    return res
+                except NoCandidateError as e:
+                    stats.add_failure(e)
+                    if verbose:
+                        logger.warning(f"{x} - {e} - {maker}")
+                    return None
                 except Exception as e:
+                    stats.add_failure(e)
                     retry += 1
                     if verbose:
                         logger.warning(
                             f"{x} - {e} - {type(e)} - {maker} retry:{retry}")
+            return None
+        finally:
+            stats.retries += min(retry, 4)
+            stats.time_ns += time.perf_counter_ns() - start
+
+    def stats(self, reset=False):
+        """
+        取得各 maker 的統計，需以 `instrument=True` 建立 pipeline
 
+        :param reset: Optional 取得後歸零
+        :retrun: `{maker 類別名稱: {"calls", "successes", "failures", "retries", "time_ns"}}`，
+            `failures` 為 `{例外類別名稱: 次數}`；未啟用統計時為空 dict
+        :rtype: dict
+        """
+        if self._stats is None:
+            return {}
+        return self._stats.snapshot(reset)
+
+    def _gen_fail(self, x, no_change_on_gen_fail):
+        if not no_change_on_gen_fail:
+            raise ZeorSearchResultsError("Data gen fail, len(out) == 0")
+        return [NoiseRecord(
+            correct=str(x),
+            incorrect=str(x),
+            type=NoChangeMaker.__name__
+        )]
+
+    def _noraml_call(self, x, k, no_change_on_gen_fail=False, verbose=True, makers=None):
+        out = []
+
+        if makers is None:
+            makers = self.makers
+
+        for maker in makers:
+            res = self._try_maker(maker, x, verbose)
+            if res is not None:
+                out.append(res)
 
-        if len(out) == 0 and not no_change_on_gen_fail:
-            raise  ZeorSearchResultsError("Data gen fail, len(out) == 0")
-        elif len(out) == 0 and no_change_on_gen_fail:
-            return [NoiseCorpus(
-                correct=x,
-                incorrect=x,
-                type=NoChangeMaker.__name__
-            )]
+        if len(out) == 0:
+            return self._gen_fail(x, no_change_on_gen_fail)
 
-        random.shuffle(out)
+        current_rng().shuffle(out)
         return out[:k]
 
+    def _lazy_call(self, x, no_change_on_gen_fail=False, verbose=True):
+        # 在隨機排列中第一個成功的 maker，等同於在所有會成功的 maker 中均勻抽一個
+        for maker in current_rng().sample(self.makers, len(self.makers)):
+            res = self._try_maker(maker, x, verbose)
+            if res is not None:
+                return [res]
+
+        return self._gen_fail(x, no_change_on_gen_fail)
+
     def _weight_call(self, x, k, no_change_on_gen_fail, verbose=True):
-        makers = random.choices(
-            population=self.makers,
-            weights=self.maker_weight,
-            k=k
-        )
+        makers = [self.makers[self._maker_sampler.sample(current_rng())] for _ in range(k)]
 
         return self._noraml_call(x, k, no_change_on_gen_fail, verbose, makers)
 
-    def __call__(self, x, error_per_sent=1, no_change_on_gen_fail=False, verbose=True):
+    def _adaptive_edit(self, x, verbose=True, exclude=None):
+        # 依排程器挑選 maker，失敗時改選本句尚未失敗的 maker
+        bucket = sentence_bucket(x)
+        failed = set()
+        while True:
+            i = self._scheduler.choose(bucket, current_rng(), failed)
+            if i is None:
+                return None
+            res = self._try_maker(self.makers[i], x, verbose, exclude)
+            if res is not None or not exclude:
+                # 與其他編輯重疊而失敗不代表 maker 不適合此類句子，不計入成功率
+                self._scheduler.update(bucket, i, res is not None)
+            if res is not None:
+                return res
+            failed.add(i)
+
+    def _adaptive_call(self, x, no_change_on_gen_fail=False, verbose=True):
+        res = self._adaptive_edit(x, verbose)
+        if res is None:
+            return self._gen_fail(x, no_change_on_gen_fail)
+        return [res]
+
+    def _plan_edit(self, x, exclude, verbose=True):
+        # 以與單一錯誤相同的方式挑選 maker，只接受不與已規劃編輯重疊的結果
+        if self._scheduler is not None:
+            return self._adaptive_edit(x, verbose, exclude)
+        if self.maker_weight is not None:
+            maker = self.makers[self._maker_sampler.sample(current_rng())]
+            return self._try_maker(maker, x, verbose, exclude)
+        for maker in current_rng().sample(self.makers, len(self.makers)):
+            res = self._try_maker(maker, x, verbose, exclude)
+            if res is not None:
+                return res
+        return None
+
+    def _multi_call(self, x, k, no_change_on_gen_fail, verbose=True):
+        """
+        在原句上規劃 k 個互不重疊的編輯並一次套用；每個編輯只在其 maker 內對原句驗證一次
+        """
+        for _ in range(5):
+            res = self._plan_multi(x, k, no_change_on_gen_fail, verbose)
+            # 相鄰的編輯仍可能互相抵銷，合併後與原句相同時重新規劃
+            if res.incorrect != res.correct or set(res.type.split('_')) == {NoChangeMaker.__name__}:
+                return res
+        return self._gen_fail(x, no_change_on_gen_fail)[0]
+
+    def _plan_multi(self, x, k, no_change_on_gen_fail, verbose=True):
+        edits = []
+        exclude = []
+        error_types = []
+        for i in range(k):
+            res = self._plan_edit(x, exclude, verbose)
+            if res is None:
+                if not no_change_on_gen_fail:
+                    raise ZeorSearchResultsError("Data gen fail, no feasible edit left")
+                error_types.append(NoChangeMaker.__name__)
+                continue
+            if res.correct_span is None:
+                # 只實作 `make` 的 maker 不回報編輯位置，剩下的錯誤改為逐次編輯前一個結果
+                if edits:
+                    return self._sequential_call(x, _apply_edits(x, edits), k - i, error_types,
+                                                 no_change_on_gen_fail, verbose)
+                error_types.append(res.type)
+                return self._sequential_call(x, res.incorrect, k - i - 1, error_types,
+                                             no_change_on_gen_fail, verbose)
+            error_types.append(res.type)
+            if res.incorrect == res.correct:
+                continue
+            start = res.incorrect_start_at
+            edits.append((start, start + len(res.correct_span), res.span))
+            exclude.append(_occupied_span(res))
+
+        return NoiseRecord(
+            correct=str(x),
+            incorrect=_apply_edits(x, edits),
+            type='_'.join(error_types)
+        )
+
+    def _sequential_call(self, x, incorrect, k, error_types, no_change_on_gen_fail, verbose=True):
+        # 每個錯誤都編輯前一個結果，無法避開已編輯的位置
+        for _ in range(k):
+            res = self._plan_edit(analyze(incorrect), None, verbose)
+            if res is None:
+                if not no_change_on_gen_fail:
+                    raise ZeorSearchResultsError("Data gen fail, no feasible edit left")
+                error_types.append(NoChangeMaker.__name__)
+                continue
+            error_types.append(res.type)
+            incorrect = res.incorrect
+
+        return NoiseRecord(
+            correct=str(x),
+            incorrect=incorrect,
+            type='_'.join(error_types)
+        )
+
+    def __call__(self, x, error_per_sent=1, no_change_on_gen_fail=False, verbose=True, rng=None, fast_record=False):
         """
         呼叫管道生成資料
 
@@ -80,29 +325,298 @@ class Pipeline():
         :param error_per_sent: Optional 在句子中生成多少錯誤
         :param no_change_on_gen_fail: 當生成失敗的時候允許使用原句（即不變換），啟用時不拋出錯誤，反之。預設:`False`
         :param verbose: 除錯或額外訊息
+        :param rng: Optional 本次生成使用的 `random.Random`，預設使用全域 `random`
+        :param fast_record: Optional 回傳不經 pydantic 驗證的 `NoiseRecord`，大量生成時使用
         :type x: str
         :type error_pre_sent: int
         :type no_change_on_gen_fail: bool
         :type verbose: bool
         :retrun: 包含錯誤句子的物件
         """
+        if rng is not None:
+            with use_rng(rng):
+                return self(x, error_per_sent, no_change_on_gen_fail, verbose, fast_record=fast_record)
 
-        ori_x = x
         assert error_per_sent >= 1
-        error_types = []
-        for i in range(error_per_sent):
+        # 所有 maker 共用一次斷詞結果
+        x = analyze(x)
+        if error_per_sent > 1:
+            out = [self._multi_call(x, error_per_sent, no_change_on_gen_fail, verbose)]
+        elif self._scheduler is not None:
+            out = self._adaptive_call(x, no_change_on_gen_fail, verbose)
+        elif self.maker_weight is None and self.lazy:
+            out = self._lazy_call(x, no_change_on_gen_fail, verbose)
+        elif self.maker_weight is None:
+            out = self._noraml_call(x, 1, no_change_on_gen_fail, verbose)
+        else:
+            out = self._weight_call(x, 1, no_change_on_gen_fail, verbose)
+
+        if self._stats is not None:
+            self._stats.maybe_emit()
+        if fast_record:
+            return out[0]
+        return out[0].to_model()
+
+    def _try_edit(self, maker, x, position, verbose=True):
+        # 在指定位置編輯一次，失敗時回傳 `None`，不重試
+        stats = None if self._stats is None else self._stats.maker(maker)
+        if stats is not None:
+            stats.calls += 1
+            start = time.perf_counter_ns()
+        try:
+            res = maker._check_record(maker.edit_at(x, position))
+            if stats is not None:
+                stats.successes += 1
+            return res
+        except Exception as e:
+            if stats is not None:
+                stats.add_failure(e)
+            if verbose:
+                logger.warning(f"{x} - {e} - {type(e)} - {maker} position:{position}")
+            return None
+        finally:
+            if stats is not None:
+                stats.time_ns += time.perf_counter_ns() - start
+
+    def variants(self, x, n, unique=True, verbose=True, rng=None, fast_record=False):
+        """
+        為同一句產生至多 n 個錯誤句，每個各含一個錯誤
+
+        只斷詞一次，以不放回的方式抽樣 (maker, 位置)：編輯失敗或產生重複結果的組合即移除，
+        所有組合用盡時提前結束，因此回傳數量可能少於 n
+
+        :param x: 一段正確的中文句子
+        :param n: 最多產生幾個錯誤句
+        :param unique: Optional 排除重複的錯誤句。預設:`True`
+        :param verbose: 除錯或額外訊息
+        :param rng: Optional 本次生成使用的 `random.Random`
+        :param fast_record: Optional 回傳 `NoiseRecord` 而非 `NoiseCorpus`
+        :rtype: list[NoiseCorpus]
+        """
+        if rng is not None:
+            with use_rng(rng):
+                return self.variants(x, n, unique, verbose, fast_record=fast_record)
+
+        x = analyze(x)
+        rng = current_rng()
+        # 只實作 `make` 的 maker 無法指定位置，權重為 0 的 maker 不會被抽中
+        active = [
+            i for i, maker in enumerate(self.makers)
+            if type(maker).edit_at is not BaseDataMaker.edit_at
+            and (self.maker_weight is None or self.maker_weight[i] > 0)
+        ]
+        pools = {}
+        seen = {str(x)}
+        out = []
+        while len(out) < n and active:
             if self.maker_weight is None:
-                out = self._noraml_call(x, 1, no_change_on_gen_fail, verbose)
-                x = out[0].incorrect
+                i = rng.choice(active)
             else:
-                out = self._weight_call(x, 1, no_change_on_gen_fail, verbose)
-                x = out[0].incorrect
-            
-            #
-            error_types.append(out[0].type)
-
-        for o in out: 
-            o.correct = ori_x
-        
-        out[0].type = '_'.join(error_types)
-        return out[0]
\ No newline at end of file
+                i, = rng.choices(active, weights=[self.maker_weight[k] for k in active])
+            maker = self.makers[i]
+            pool = pools.get(i)
+            if pool is None:
+                pool = pools[i] = maker.candidates(x)
+            if len(pool) == 0:
+                active.remove(i)
+                continue
+
+            j = rng.randrange(len(pool))
+            res = self._try_edit(maker, x, pool[j], verbose)
+            if res is not None and not (unique and res.incorrect in seen):
+                # 隨機選字的 maker 在同一位置可能還有其他結果，保留該組合
+                seen.add(res.incorrect)
+                out.append(res)
+                continue
+            pool[j] = pool[-1]
+            pool.pop()
+
+        if self._stats is not None:
+            self._stats.maybe_emit()
+        if fast_record:
+            return out
+        return [res.to_model() for res in out]
+
+    def _warmup(self):
+        """
+        預先載入 jieba 字典與各 maker 的 `Pronounce2Word`
+        """
+        import jieba
+        jieba.initialize()
+        for maker in self.makers:
+            if hasattr(maker, '_p2w'):
+                maker.p2w
+
+    def _call_many(self, items, call_kwargs, seed=None):
+        out = []
+        for index, x in items:
+            kwargs = call_kwargs if seed is None else dict(call_kwargs, rng=sample_rng(seed, index))
+            try:
+                out.append(self(x, **kwargs))
+            except Exception as e:
+                out.append(e)
+        return out
+
+    def imap(self, sentences, workers=None, chunksize=64, error_per_sent=1, no_change_on_gen_fail=False, verbose=False, seed=None, shard=None, fast_record=False):
+        """
+        以多進程批次生成資料，依輸入順序逐筆回傳
+
+        單筆失敗時不會中斷整批，該筆位置改為回傳拋出的例外實例
+
+        :param sentences: 可迭代的正確句子
+        :param workers: Optional 進程數，預設為 CPU 數；`workers<=1` 時於當前進程執行
+        :param chunksize: 每個任務包含的句子數
+        :param error_per_sent: Optional 在句子中生成多少錯誤
+        :param no_change_on_gen_fail: 當生成失敗的時候允許使用原句（即不變換）
+        :param verbose: 除錯或額外訊息
+        :param seed: Optional 隨機種子；每一句以 (seed, 句子序號) 推導出自己的亂數，結果與進程數、chunksize 無關
+        :param shard: Optional `(i, n)` 或 `"i/n"`，只處理序號除以 n 餘 i 的句子；
+            n 個分片各自產生的結果合併後與單機執行相同
+        :param fast_record: Optional 產生 `NoiseRecord` 而非 `NoiseCorpus`，省去 pydantic 驗證
+        :type sentences: Iterable[str]
+        :type workers: int
+        :type chunksize: int
+        :type seed: int
+        :retrun: 依序產生 `NoiseCorpus`（或 `NoiseRecord`）或例外實例
+        """
+        assert chunksize >= 1
+        call_kwargs = dict(
+            error_per_sent=error_per_sent,
+            no_change_on_gen_fail=no_change_on_gen_fail,
+            verbose=verbose,
+            fast_record=fast_record
+        )
+        if workers is None:
+            workers = os.cpu_count() or 1
+
+        items = enumerate(sentences)
+        if shard is not None:
+            shard_index, num_shards = parse_shard(shard)
+            items = ((i, x) for i, x in items if i % num_shards == shard_index)
+        chunks = iter(lambda: list(islice(items, chunksize)), [])
+
+        if workers <= 1:
+            for chunk in chunks:
+                yield from self._call_many(chunk, call_kwargs, seed)
+            return
+
+        with multiprocessing.Pool(workers, initializer=_init_worker, initargs=(self,)) as pool:
+            # 限制同時送出的任務數，避免一次讀入整個輸入
+            pending = deque()
+            for chunk in chunks:
+                pending.append(pool.apply_async(
+                    _run_chunk, (chunk, call_kwargs, seed)))
+                if len(pending) >= workers * 2:
+                    yield from self._collect(pending.popleft().get())
+            while pending:
+                yield from self._collect(pending.popleft().get())
+
+    def _collect(self, result):
+        out, stats = result
+        if stats is not None and self._stats is not None:
+            self._stats.merge(stats)
+            self._stats.maybe_emit()
+        return out
+
+    def generate_batch(self, sentences, workers=None, chunksize=64, error_per_sent=1, no_change_on_gen_fail=False, verbose=False, seed=None, shard=None, fast_record=False):
+        """
+        批次生成資料，參數同 `imap`
+
+        :retrun: 與輸入等長的 list，失敗的位置為例外實例
+        """
+        return list(self.imap(
+            sentences,
+            workers=workers,
+            chunksize=chunksize,
+            error_per_sent=error_per_sent,
+            no_change_on_gen_fail=no_change_on_gen_fail,
+            verbose=verbose,
+            seed=seed,
+            shard=shard,
+            fast_record=fast_record
+        ))
+
+    def process_executor(self, workers=None):
+        """
+        建立給 `agenerate`/`astream` 使用的進程池，每個子進程預先載入此 pipeline 與字典，
+        之後的任務只需傳送句子
+
+        :param workers: Optional 進程數，預設為 CPU 數
+        :rtype: concurrent.futures.ProcessPoolExecutor
+        """
+        executor = ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(self,))
+        _initialized_executors[executor] = self
+        return executor
+
+    def _submit(self, executor, chunk, call_kwargs, seed=None):
+        # 在 executor 中執行 `_call_many`，回傳 asyncio future；結果為 (輸出 list, 統計增量)
+        loop = asyncio.get_running_loop()
+        if isinstance(executor, ProcessPoolExecutor):
+            # 非 `process_executor` 建立的進程池，每個任務都需要傳送整個 pipeline
+            pipeline = None if _initialized_executors.get(executor) is self else self
+            return loop.run_in_executor(executor, _run_chunk, chunk, call_kwargs, seed, pipeline)
+        return loop.run_in_executor(executor, lambda: (self._call_many(chunk, call_kwargs, seed), None))
+
+    async def agenerate(self, x, error_per_sent=1, no_change_on_gen_fail=False, verbose=False, rng=None, fast_record=False, executor=None):
+        """
+        在 executor 中生成資料，不阻塞事件迴圈；取消此 coroutine 時尚未開始的任務會一併取消
+
+        :param executor: Optional `concurrent.futures.Executor`，預設為事件迴圈的執行緒池；
+            使用進程池時建議以 `process_executor` 建立
+        :param rng: Optional 本次生成使用的 `random.Random`
+        其餘參數同 `__call__`
+        :retrun: 包含錯誤句子的物件
+        """
+        call_kwargs = dict(
+            error_per_sent=error_per_sent,
+            no_change_on_gen_fail=no_change_on_gen_fail,
+            verbose=verbose,
+            fast_record=fast_record
+        )
+        if rng is not None:
+            call_kwargs['rng'] = rng
+        out, = self._collect(await self._submit(executor, [(0, x)], call_kwargs))
+        if isinstance(out, Exception):
+            raise out
+        return out
+
+    async def astream(self, sentences, error_per_sent=1, no_change_on_gen_fail=False, verbose=False, seed=None, fast_record=False, executor=None, max_in_flight=None):
+        """
+        從(非)同步可迭代物件讀取句子，在 executor 中生成並依輸入順序逐筆產出
+
+        同時進行中的任務達到 `max_in_flight` 時暫停讀取輸入；
+        消費端停止迭代或被取消時，尚未開始的任務會被取消
+
+        單筆失敗時不會中斷，該筆位置改為產出拋出的例外實例
+
+        :param sentences: `AsyncIterable[str]` 或 `Iterable[str]`
+        :param seed: Optional 每一句以 (seed, 句子序號) 推導出自己的亂數，與 `imap` 相同
+        :param executor: Optional 同 `agenerate`
+        :param max_in_flight: Optional 同時進行中的任務數上限，預設為 CPU 數的兩倍
+        其餘參數同 `__call__`
+        """
+        call_kwargs = dict(
+            error_per_sent=error_per_sent,
+            no_change_on_gen_fail=no_change_on_gen_fail,
+            verbose=verbose,
+            fast_record=fast_record
+        )
+        if max_in_flight is None:
+            max_in_flight = (os.cpu_count() or 1) * 2
+        assert max_in_flight >= 1
+
+        pending = deque()
+        try:
+            index = 0
+            async for x in _aiter(sentences):
+                pending.append(self._submit(executor, [(index, x)], call_kwargs, seed))
+                index += 1
+                if len(pending) >= max_in_flight:
+                    for out in self._collect(await pending.popleft()):
+                        yield out
+            while pending:
+                for out in self._collect(await pending.popleft()):
+                    yield out
+        finally:
+            for future in pending:
+                future.cancel()
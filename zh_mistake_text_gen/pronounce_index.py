@@ -0,0 +1,133 @@
+import argparse
+import json
+from itertools import combinations
+
+try:
+    # py_chinese_pronounce 本身依賴 python-Levenshtein
+    from Levenshtein import distance as _distance
+except ImportError:  # pragma: no cover
+    _distance = None
+
+FORMAT = 'zh-mistake-text-gen/pronounce-index'
+VERSION = 1
+
+
+def _deletions(word, max_deletes):
+    # 刪去至多 max_deletes 個字元的所有結果（含原字串）
+    out = {word}
+    for n in range(1, min(max_deletes, len(word)) + 1):
+        for drop in combinations(range(len(word)), n):
+            out.add(''.join(c for i, c in enumerate(word) if i not in drop))
+    return out
+
+
+def levenshtein(a, b, limit=None):
+    """
+    編輯距離；提供 `limit` 時，超過上限即提前回傳 `limit + 1`
+    """
+    if len(a) < len(b):
+        a, b = b, a
+    if limit is not None and len(a) - len(b) > limit:
+        return limit + 1
+    prev = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        cur = [i]
+        for j, cb in enumerate(b, 1):
+            cur.append(min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + (ca != cb)))
+        if limit is not None and min(cur) > limit:
+            return limit + 1
+        prev = cur
+    return prev[-1]
+
+
+class PronounceIndex():
+    def __init__(self, keys, max_level=2, deletions=None):
+        """
+        漢語發音的刪除鄰域索引（SymSpell），查詢編輯距離在 `level` 以內的發音
+
+        兩字串編輯距離不超過 L 時，各自刪去至多 L 個字元必有相同的結果，
+        因此只需比對共享刪除結果的候選，再以編輯距離確認
+
+        :param keys: 所有漢語發音，查詢結果依此順序回傳
+        :param max_level: 支援的最大編輯距離
+        :param deletions: Optional 預先建好的 `{刪除結果: [key 序號]}`，由 `load` 使用
+        """
+        self.keys = tuple(keys)
+        self.max_level = max_level
+        if deletions is None:
+            deletions = {}
+            for i, key in enumerate(self.keys):
+                for d in _deletions(key, max_level):
+                    deletions.setdefault(d, []).append(i)
+        self._deletions = {d: tuple(ids) for d, ids in deletions.items()}
+
+    @classmethod
+    def from_p2w(cls, p2w, max_level=2):
+        """
+        以 `Pronounce2Word` 的所有發音建立索引
+        """
+        return cls(p2w.han2word_map.keys(), max_level)
+
+    def query(self, han, level=1):
+        """
+        與 `Pronounce2Word._find_similar_han_pronounces` 結果相同，依發音表順序回傳
+
+        :param han: 漢語發音
+        :param level: 最大編輯距離，不可超過 `max_level`
+        :rtype: tuple[str]
+        """
+        if level > self.max_level:
+            raise ValueError(f"level {level} exceeds index max_level {self.max_level}")
+        candidates = set()
+        for d in _deletions(han, level):
+            candidates.update(self._deletions.get(d, ()))
+        if _distance is not None:
+            return tuple(
+                self.keys[i] for i in sorted(candidates)
+                if _distance(han, self.keys[i], score_cutoff=level) <= level
+            )
+        return tuple(
+            self.keys[i] for i in sorted(candidates)
+            if levenshtein(han, self.keys[i], level) <= level
+        )
+
+    def save(self, path):
+        """
+        寫出為 JSON 檔案
+        """
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({
+                'format': FORMAT,
+                'version': VERSION,
+                'max_level': self.max_level,
+                'keys': self.keys,
+                'deletions': self._deletions,
+            }, f, ensure_ascii=False)
+
+    @classmethod
+    def load(cls, path):
+        """
+        載入 `save` 寫出的檔案
+        """
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)
+        if data.get('format') != FORMAT or data.get('version') != VERSION:
+            raise ValueError(f"{path} is not a pronounce index file")
+        return cls(data['keys'], data['max_level'], data['deletions'])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='python -m zh_mistake_text_gen.pronounce_index',
+        description='預先建立發音編輯距離索引'
+    )
+    parser.add_argument('output', help='輸出檔案')
+    parser.add_argument('--max-level', type=int, default=2)
+    args = parser.parse_args(argv)
+
+    from .utils import Pronounce2Word
+    PronounceIndex.from_p2w(Pronounce2Word(), args.max_level).save(args.output)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,96 @@
+import os
+import threading
+from importlib.util import find_spec
+
+high_freq_zh_char_path = os.path.join(
+    os.path.dirname(__file__),
+    'high_freq_zh_char.txt'
+)
+
+# 只定位套件目錄，不匯入 py_chinese_pronounce（匯入時會載入 pandas）
+sc_dict_path = os.path.join(
+    list(find_spec('py_chinese_pronounce').submodule_search_locations)[0],
+    'sc-dict.txt'
+)
+
+# 進程內共用的資源登錄表：字表、OpenCC 轉換器等只在第一次取用時載入一次
+_loaders = {}
+_resources = {}
+_lock = threading.RLock()
+
+
+def register_resource(name):
+    """
+    註冊資源載入函數
+
+    :param name: 資源名稱
+    """
+    def decorator(loader):
+        _loaders[name] = loader
+        return loader
+    return decorator
+
+
+def get_resource(name):
+    """
+    取得共用資源，第一次取用時載入；回傳的物件為共用，不可修改
+
+    :param name: 資源名稱
+    """
+    try:
+        return _resources[name]
+    except KeyError:
+        pass
+
+    with _lock:
+        if name not in _resources:
+            _resources[name] = _loaders[name]()
+        return _resources[name]
+
+
+def clear_resources():
+    """
+    清除已載入的資源
+    """
+    with _lock:
+        _resources.clear()
+
+
+@register_resource('t2s')
+def _load_t2s():
+    from opencc import OpenCC
+    return OpenCC('t2s.json')
+
+
+@register_resource('t2s_char')
+def _load_t2s_char():
+    # 逐字繁轉簡，每個字只呼叫一次 OpenCC；字數有限，不設上限
+    convert = get_resource('t2s').convert
+    table = {}
+
+    def t2s_char(text):
+        out = []
+        for c in text:
+            s = table.get(c)
+            if s is None:
+                s = table[c] = convert(c)
+            out.append(s)
+        return ''.join(out)
+    return t2s_char
+
+
+@register_resource('high_freq_zh_char')
+def _load_high_freq_zh_char():
+    with open(high_freq_zh_char_path, encoding='utf-8') as f:
+        return tuple(line.replace('\n', '') for line in f)
+
+
+@register_resource('high_freq_zh_char_set')
+def _load_high_freq_zh_char_set():
+    return frozenset(get_resource('high_freq_zh_char'))
+
+
+@register_resource('sc_dict')
+def _load_sc_dict():
+    with open(sc_dict_path, 'r', encoding='utf-8') as f:
+        return tuple(f.read().split())
@@ -0,0 +1,189 @@
+import random
+import threading
+from contextlib import contextmanager
+
+_MASK64 = (1 << 64) - 1
+_local = threading.local()
+_np = False
+
+
+def _numpy():
+    # NumPy 為可選依賴，第一次需要向量化抽樣時才匯入；未安裝時回傳 `None`
+    global _np
+    if _np is False:
+        try:
+            import numpy
+        except ImportError:  # pragma: no cover
+            numpy = None
+        _np = numpy
+    return _np
+
+
+def _numpy_rng(np, rng):
+    # 由 `random.Random`（預設為 `current_rng()`）推導 NumPy Generator，讓 `use_rng` 與種子同樣有效
+    if rng is None:
+        rng = current_rng()
+    if isinstance(rng, np.random.Generator):
+        return rng
+    return np.random.default_rng(rng.getrandbits(64))
+
+
+def current_rng():
+    """
+    目前執行緒使用的亂數產生器；未以 `use_rng` 指定時為全域 `random` 模組
+    """
+    rng = getattr(_local, 'rng', None)
+    return random if rng is None else rng
+
+
+@contextmanager
+def use_rng(rng):
+    """
+    在區塊內讓 maker 與 pipeline 改用指定的亂數產生器
+
+    :param rng: `random.Random` 實例，`None` 表示沿用目前設定
+    """
+    prev = getattr(_local, 'rng', None)
+    if rng is not None:
+        _local.rng = rng
+    try:
+        yield current_rng()
+    finally:
+        _local.rng = prev
+
+
+def sample_seed(seed, index):
+    """
+    由 (全域種子, 樣本序號) 推導出每個樣本的種子（splitmix64），與處理順序及進程無關
+
+    :type seed: int
+    :type index: int
+    :rtype: int
+    """
+    z = (seed * 0x9E3779B97F4A7C15 + (index + 1) * 0xBF58476D1CE4E5B9) & _MASK64
+    z = ((z ^ (z >> 30)) * 0xBF58476D1CE4E5B9) & _MASK64
+    z = ((z ^ (z >> 27)) * 0x94D049BB133111EB) & _MASK64
+    return z ^ (z >> 31)
+
+
+def sample_rng(seed, index):
+    """
+    第 `index` 個樣本專用的 `random.Random`
+    """
+    return random.Random(sample_seed(seed, index))
+
+
+class AliasSampler():
+    def __init__(self, weights):
+        """
+        Walker/Vose alias method，建表 O(n)，每次抽樣 O(1)
+
+        :param weights: 每個索引的權重，不需正規化
+        :type weights: Sequence[float]
+        """
+        n = len(weights)
+        total = float(sum(weights))
+        if n == 0 or total <= 0:
+            raise ValueError('weights should contain at least one positive value')
+        if any(w < 0 for w in weights):
+            raise ValueError('weights should be non-negative')
+
+        self.n = n
+        self.prob = [0.0] * n
+        self.alias = list(range(n))
+
+        scaled = [w * n / total for w in weights]
+        small = [i for i, p in enumerate(scaled) if p < 1.0]
+        large = [i for i, p in enumerate(scaled) if p >= 1.0]
+        while small and large:
+            s, l = small.pop(), large.pop()
+            self.prob[s] = scaled[s]
+            self.alias[s] = l
+            scaled[l] = scaled[l] + scaled[s] - 1.0
+            if scaled[l] < 1.0:
+                small.append(l)
+            else:
+                large.append(l)
+        for i in small + large:
+            self.prob[i] = 1.0
+
+        self._np_prob = None
+        self._np_alias = None
+
+    def sample(self, rng=None):
+        """
+        抽一個索引
+
+        :param rng: Optional `random.Random` 實例，預設為 `current_rng()`
+        :rtype: int
+        """
+        if rng is None:
+            rng = current_rng()
+        i = int(rng.random() * self.n)
+        if rng.random() < self.prob[i]:
+            return i
+        return self.alias[i]
+
+    def sample_many(self, k, rng=None):
+        """
+        一次抽 k 個索引；安裝 NumPy 時使用向量化路徑
+
+        :param k: 數量
+        :param rng: Optional `random.Random` 實例，預設為 `current_rng()`；安裝 NumPy 時也可傳入 `numpy.random.Generator`
+        :retrun: 索引陣列（NumPy）或 list
+        """
+        np = _numpy()
+        if np is None:
+            if rng is None:
+                rng = current_rng()
+            return [self.sample(rng) for _ in range(k)]
+
+        if self._np_prob is None:
+            self._np_prob = np.asarray(self.prob)
+            self._np_alias = np.asarray(self.alias)
+        rng = _numpy_rng(np, rng)
+        i = rng.integers(0, self.n, size=k)
+        keep = rng.random(size=k) < self._np_prob[i]
+        return np.where(keep, i, self._np_alias[i])
+
+
+class WeightedChoice():
+    def __init__(self, population, weights=None):
+        """
+        依權重從 `population` 中抽樣；未提供權重時為均勻抽樣
+
+        :param population: 候選項目
+        :param weights: Optional 每個項目的權重
+        """
+        self.population = tuple(population)
+        self._sampler = None if weights is None else AliasSampler(weights)
+
+    def __len__(self):
+        return len(self.population)
+
+    def choice(self, rng=None):
+        """
+        抽一個項目
+
+        :param rng: Optional `random.Random` 實例，預設為 `current_rng()`
+        """
+        if rng is None:
+            rng = current_rng()
+        if self._sampler is None:
+            return rng.choice(self.population)
+        return self.population[self._sampler.sample(rng)]
+
+    def choices(self, k, rng=None):
+        """
+        一次抽 k 個項目，參數同 `AliasSampler.sample_many`
+        """
+        np = _numpy()
+        if self._sampler is not None:
+            indices = self._sampler.sample_many(k, rng)
+        elif np is not None:
+            rng = _numpy_rng(np, rng)
+            indices = rng.integers(0, len(self.population), size=k)
+        else:
+            rng = current_rng() if rng is None else rng
+            indices = [rng.randrange(len(self.population)) for _ in range(k)]
+        return [self.population[i] for i in indices]
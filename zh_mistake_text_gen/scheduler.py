@@ -0,0 +1,121 @@
+import math
+from bisect import bisect_left
+from .resource import get_resource
+
+# 句長分組的上界：1~2、3~5、6~10、11~20、21~50、50 以上
+LENGTH_BUCKETS = (2, 5, 10, 20, 50)
+
+# 高頻字比例分組的下界：大多為高頻字、混合、罕用字或非漢字為主
+HIGH_FREQ_RATIO_BUCKETS = (0.8, 0.4)
+
+
+def sentence_bucket(x):
+    """
+    依句長與高頻字比例將句子分組，同組句子的 maker 成功率相近
+
+    :rtype: tuple[int, int]
+    """
+    if len(x) == 0:
+        return (0, len(HIGH_FREQ_RATIO_BUCKETS))
+    high_freq = get_resource('high_freq_zh_char_set')
+    ratio = sum(map(high_freq.__contains__, x)) / len(x)
+    char_class = sum(ratio < bound for bound in HIGH_FREQ_RATIO_BUCKETS)
+    return (bisect_left(LENGTH_BUCKETS, len(x)), char_class)
+
+
+class AdaptiveScheduler():
+    def __init__(self, weights, min_prob=0.02, max_boost=10.0, deficit_scale=10.0, refresh_interval=16):
+        """
+        依觀察到的成功率挑選 maker，同時維持輸出類型的目標比例
+
+        每個 maker 的分數為 `目標權重 * 該組句子的估計成功率 * 比例修正`：
+        估計成功率讓 maker 少被用在常失敗的句子上；比例修正依目前輸出中各類型與目標比例的差距調整，
+        讓較少成功的 maker 在它容易成功的句子上多被選中；修正隨累積的差距增長，整體比例會收斂到目標
+
+        :param weights: 各 maker 的目標輸出比例
+        :param min_prob: 估計成功率的下限，讓失敗過的 maker 仍有機會被重新評估
+        :param max_boost: 比例修正的上限倍數
+        :param deficit_scale: 輸出數每落後（或超前）目標此筆數，比例修正乘以（或除以）e
+        :param refresh_interval: 每成功產生此筆數後重新計算比例修正
+        """
+        total = sum(weights)
+        assert total > 0, '`weights` must contain a positive value'
+        self.targets = [w / total for w in weights]
+        self.min_prob = min_prob
+        self.max_boost = max_boost
+        self.deficit_scale = deficit_scale
+        self.refresh_interval = refresh_interval
+        self._makers = range(len(weights))
+        # {分組: [[成功次數, 嘗試次數], ...]}
+        self._attempts = {}
+        # {分組: [目標權重 * 估計成功率, ...]}，隨 `update` 更新
+        self._scores = {}
+        self._produced = [0] * len(weights)
+        self._total = 0
+        self._boosts = [1.0] * len(weights)
+
+    def _bucket_scores(self, bucket):
+        scores = self._scores.get(bucket)
+        if scores is None:
+            self._attempts[bucket] = [[0, 0] for _ in self._makers]
+            scores = self._scores[bucket] = [target * self.success_rate(bucket, i) for i, target in enumerate(self.targets)]
+        return scores
+
+    def success_rate(self, bucket, i):
+        """
+        maker `i` 在該組句子的估計成功率（Beta(1, 1) 先驗）
+        """
+        successes, attempts = self._attempts[bucket][i] if bucket in self._attempts else (0, 0)
+        return max((successes + 1) / (attempts + 2), self.min_prob)
+
+    def _refresh_boosts(self):
+        # 依累積差距的指數修正，持續落後的類型分數持續增加，不會停在偏離目標的比例
+        limit = math.log(self.max_boost)
+        self._boosts = [
+            math.exp(min(max((target * self._total - produced) / self.deficit_scale, -limit), limit))
+            for target, produced in zip(self.targets, self._produced)
+        ]
+
+    def choose(self, bucket, rng, exclude=()):
+        """
+        抽選一個 maker
+
+        :param bucket: `sentence_bucket` 的結果
+        :param rng: 亂數產生器
+        :param exclude: Optional 本句已失敗、不再嘗試的 maker 序號
+        :retrun: maker 序號，沒有可選的 maker 時為 `None`
+        :rtype: int
+        """
+        scores = [score * boost for score, boost in zip(self._bucket_scores(bucket), self._boosts)]
+        if exclude:
+            for i in exclude:
+                scores[i] = 0.0
+            if sum(scores) <= 0:
+                return None
+        i, = rng.choices(self._makers, weights=scores)
+        return i
+
+    def update(self, bucket, i, success):
+        """
+        記錄 maker `i` 的嘗試結果
+        """
+        scores = self._bucket_scores(bucket)
+        counts = self._attempts[bucket][i]
+        counts[1] += 1
+        if success:
+            counts[0] += 1
+            self._produced[i] += 1
+            self._total += 1
+            if self._total % self.refresh_interval == 0:
+                self._refresh_boosts()
+        scores[i] = self.targets[i] * self.success_rate(bucket, i)
+
+    def snapshot(self):
+        """
+        :retrun: `{"produced": [各 maker 輸出次數], "buckets": {分組: [[成功次數, 嘗試次數], ...]}}`
+        :rtype: dict
+        """
+        return {
+            'produced': list(self._produced),
+            'buckets': {bucket: [list(c) for c in counts] for bucket, counts in self._attempts.items()},
+        }
@@ -0,0 +1,114 @@
+import threading
+import time
+
+
+class MakerStats():
+    """
+    單一 maker 的累計統計
+
+    - `calls`: 被 pipeline 呼叫的次數
+    - `successes`: 成功產生資料的次數
+    - `failures`: 各例外類別的失敗次數（每次嘗試各計一次）
+    - `retries`: 失敗後重試的次數
+    - `time_ns`: 累計耗時（含重試）
+    """
+    __slots__ = ('calls', 'successes', 'failures', 'retries', 'time_ns')
+
+    def __init__(self):
+        self.calls = 0
+        self.successes = 0
+        self.failures = {}
+        self.retries = 0
+        self.time_ns = 0
+
+    def add_failure(self, exc):
+        name = exc.__class__.__name__
+        self.failures[name] = self.failures.get(name, 0) + 1
+
+    def merge(self, other):
+        """
+        :param other: `to_dict` 的輸出
+        """
+        self.calls += other['calls']
+        self.successes += other['successes']
+        self.retries += other['retries']
+        self.time_ns += other['time_ns']
+        for name, count in other['failures'].items():
+            self.failures[name] = self.failures.get(name, 0) + count
+
+    def to_dict(self):
+        return {
+            'calls': self.calls,
+            'successes': self.successes,
+            'failures': dict(self.failures),
+            'retries': self.retries,
+            'time_ns': self.time_ns,
+        }
+
+
+class PipelineStats():
+    def __init__(self, hook=None, interval=60.0):
+        """
+        `Pipeline` 中各 maker 的統計，以 maker 類別名稱區分
+
+        :param hook: Optional 定期呼叫 `hook(snapshot)`，`snapshot` 為 `snapshot()` 的輸出
+        :param interval: 呼叫 `hook` 的最短間隔秒數
+        """
+        self.hook = hook
+        self.interval = interval
+        self._makers = {}
+        self._lock = threading.Lock()
+        self._last_emit = time.monotonic()
+
+    def __getstate__(self):
+        # hook 通常無法序列化，子進程中只累計、由主進程合併後呼叫
+        return {'hook': None, 'interval': self.interval, '_makers': {}}
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+        self._last_emit = time.monotonic()
+
+    def maker(self, maker):
+        """
+        取得 maker 的統計物件
+
+        :rtype: MakerStats
+        """
+        name = maker.__class__.__name__
+        stats = self._makers.get(name)
+        if stats is None:
+            with self._lock:
+                stats = self._makers.setdefault(name, MakerStats())
+        return stats
+
+    def snapshot(self, reset=False):
+        """
+        :param reset: 取得後歸零
+        :retrun: `{maker 名稱: MakerStats.to_dict()}`
+        :rtype: dict
+        """
+        with self._lock:
+            out = {name: stats.to_dict() for name, stats in self._makers.items()}
+            if reset:
+                self._makers = {}
+        return out
+
+    def merge(self, snapshot):
+        """
+        合併其他進程的 `snapshot`
+        """
+        with self._lock:
+            for name, other in snapshot.items():
+                self._makers.setdefault(name, MakerStats()).merge(other)
+
+    def maybe_emit(self):
+        """
+        距離上次呼叫 `hook` 已超過 `interval` 秒時呼叫 `hook`
+        """
+        if self.hook is None:
+            return
+        now = time.monotonic()
+        if now - self._last_emit >= self.interval:
+            self._last_emit = now
+            self.hook(self.snapshot())
@@ -1,6 +1,7 @@
-from py_chinese_pronounce import Pronounce2Word as _Pronounce2Word
 import os
-import edit_distance
+import sys
+import threading
+from collections import OrderedDict, deque
 
 def singleton(class_):
     instances = {}
@@ -10,19 +11,366 @@ def singleton(class_):
         return instances[class_]
     return getinstance
 
-@singleton
-class Pronounce2Word(_Pronounce2Word):
-    pass
+# 每種查詢的快取筆數上限與所有查詢合計的記憶體上限（估算值）
+PRONOUNCE_CACHE_SIZE = 65536
+PRONOUNCE_CACHE_BYTES = 256 * 1024 * 1024
+# 未指定索引時，自動建立的發音索引支援的最大編輯距離
+PRONOUNCE_INDEX_LEVEL = 2
 
-disable_words = open(
-    os.path.join(
-        os.path.dirname(__file__),
-        "disable_words.txt"
-    ),
-    "r",encoding="utf-8"
-).read().split()
+
+def _sizeof(obj):
+    # 淺層估算：容器本身加上其中每個元素
+    size = sys.getsizeof(obj)
+    if isinstance(obj, (tuple, frozenset)):
+        size += sum(sys.getsizeof(item) for item in obj)
+    return size
+
+
+class _Raised():
+    # 查詢時拋出的例外，同樣快取起來，避免非中文字元反覆查詢失敗
+    __slots__ = ('exc',)
+
+    def __init__(self, exc):
+        self.exc = exc
+
+
+class LookupCache():
+    def __init__(self, fn, maxsize=PRONOUNCE_CACHE_SIZE, max_bytes=None, sort=False):
+        """
+        執行緒安全的 LRU 快取；list/set 結果轉為 tuple 儲存，呼叫端無法修改快取內容
+
+        :param fn: 查詢函數
+        :param maxsize: 快取筆數上限，`0` 表示不快取
+        :param max_bytes: Optional 快取估算記憶體上限
+        :param sort: Optional 結果排序後再儲存，用於順序不固定（來自 set）的查詢
+        """
+        self.fn = fn
+        self.sort = sort
+        self.maxsize = maxsize
+        self.max_bytes = max_bytes
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.bytes = 0
+
+    def __call__(self, *args, **kwargs):
+        key = args if not kwargs else args + tuple(sorted(kwargs.items()))
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                self._data.move_to_end(key)
+                self.hits += 1
+        if entry is None:
+            try:
+                value = self.fn(*args, **kwargs)
+                if isinstance(value, (list, set)):
+                    value = tuple(sorted(value)) if self.sort else tuple(value)
+                entry = (value, _sizeof(key) + _sizeof(value))
+            except Exception as exc:
+                entry = (_Raised(exc), _sizeof(key))
+            self._put(key, entry)
+
+        value = entry[0]
+        if isinstance(value, _Raised):
+            raise value.exc.with_traceback(None)
+        return value
+
+    def _put(self, key, entry):
+        with self._lock:
+            self.misses += 1
+            if self.maxsize <= 0 or key in self._data:
+                return
+            self._data[key] = entry
+            self.bytes += entry[1]
+            while self._data and (len(self._data) > self.maxsize or
+                                  (self.max_bytes is not None and self.bytes > self.max_bytes)):
+                _, (_, size) = self._data.popitem(last=False)
+                self.bytes -= size
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.bytes = 0
+
+    def stats(self):
+        """
+        :retrun: `{"hits", "misses", "hit_rate", "size", "bytes", "evictions"}`
+        :rtype: dict
+        """
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / total if total else 0.0,
+                'size': len(self._data),
+                'bytes': self.bytes,
+                'evictions': self.evictions,
+            }
+
+
+class CachedPronounce2Word():
+    """
+    為 `py_chinese_pronounce.Pronounce2Word` 的查詢加上 LRU 快取，其餘屬性直接轉給原物件
+
+    快取的結果為 tuple，不會因為呼叫端排序或洗牌而被修改；
+    `SORTED_METHODS` 的結果來自 set，快取時先排序，使輸出不受 hash 隨機化影響
+    """
+    CACHED_METHODS = (
+        'find_similar',
+        'find_same',
+        'find_similar_vocab',
+        'find_similar_vocab_level',
+        'find_same_vocab',
+        'to_han',
+        'han2word',
+        '_find_similar_han_pronounces',
+    )
+    SORTED_METHODS = ('find_similar', 'find_same', 'han2word')
+
+    def __init__(self, p2w, maxsize=PRONOUNCE_CACHE_SIZE, max_bytes=PRONOUNCE_CACHE_BYTES):
+        """
+        :param p2w: 原始的 `Pronounce2Word` 實例
+        :param maxsize: 每種查詢的快取筆數上限，或 `{方法名稱: 上限}`
+        :param max_bytes: 所有查詢合計的估算記憶體上限，平均分給每種查詢
+        """
+        self._p2w = p2w
+        self._caches = {}
+        self._lookups = {name: getattr(p2w, name) for name in self.CACHED_METHODS}
+        # 編輯距離搜尋改走發音索引
+        self._lookups['_find_similar_han_pronounces'] = self._similar_han
+        self._find_similar_han_fallback = getattr(p2w, '_find_similar_han_pronounces')
+        self._pronounce_index = None
+        self._pronounce_index_lock = threading.Lock()
+        self.configure(maxsize, max_bytes)
+
+    def configure(self, maxsize=PRONOUNCE_CACHE_SIZE, max_bytes=PRONOUNCE_CACHE_BYTES):
+        """
+        重新設定快取上限並清空快取，參數同建構子
+        """
+        for name in self.CACHED_METHODS:
+            size = maxsize.get(name, PRONOUNCE_CACHE_SIZE) if isinstance(maxsize, dict) else maxsize
+            cache = LookupCache(
+                self._lookups[name],
+                size,
+                None if max_bytes is None else max_bytes // len(self.CACHED_METHODS),
+                sort=name in self.SORTED_METHODS
+            )
+            self._caches[name] = cache
+            setattr(self, name, cache)
+        # `find_similar_vocab_level` 在原物件內部呼叫，一併改用快取與索引
+        self._p2w._find_similar_han_pronounces = self._caches['_find_similar_han_pronounces']
+
+    def use_pronounce_index(self, index):
+        """
+        使用預先建立（例如以 `PronounceIndex.load` 載入）的發音索引
+
+        :type index: zh_mistake_text_gen.pronounce_index.PronounceIndex
+        """
+        self._pronounce_index = index
+        self._caches['_find_similar_han_pronounces'].clear()
+
+    def _similar_han(self, han, level=1):
+        index = self._pronounce_index
+        if index is None:
+            with self._pronounce_index_lock:
+                if self._pronounce_index is None:
+                    from .pronounce_index import PronounceIndex
+                    self._pronounce_index = PronounceIndex.from_p2w(self._p2w, PRONOUNCE_INDEX_LEVEL)
+                index = self._pronounce_index
+        if level > index.max_level:
+            return self._find_similar_han_fallback(han, level=level)
+        return index.query(han, level)
+
+    def cache_stats(self):
+        """
+        :retrun: `{方法名稱: LookupCache.stats()}`
+        :rtype: dict
+        """
+        return {name: cache.stats() for name, cache in self._caches.items()}
+
+    def cache_clear(self):
+        for cache in self._caches.values():
+            cache.clear()
+
+    def __getattr__(self, name):
+        if name == '_p2w':
+            raise AttributeError(name)
+        return getattr(self._p2w, name)
+
+
+_pronounce2word = None
+_pronounce2word_lock = threading.Lock()
+
+def Pronounce2Word():
+    """
+    共用的 `CachedPronounce2Word` 實例，第一次呼叫時才匯入 `py_chinese_pronounce` 並載入字典
+    """
+    global _pronounce2word
+    if _pronounce2word is None:
+        with _pronounce2word_lock:
+            if _pronounce2word is None:
+                from py_chinese_pronounce import Pronounce2Word as _Pronounce2Word
+                _pronounce2word = CachedPronounce2Word(_Pronounce2Word())
+    return _pronounce2word
+
+class _AhoCorasick():
+    """
+    多模式字串比對自動機
+    """
+
+    def __init__(self, words):
+        self.goto = [{}]
+        self.fail = [0]
+        self.out = [()]
+
+        for word in words:
+            node = 0
+            for ch in word:
+                nxt = self.goto[node].get(ch)
+                if nxt is None:
+                    nxt = len(self.goto)
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.out.append(())
+                    self.goto[node][ch] = nxt
+                node = nxt
+            self.out[node] += (len(word),)
+
+        queue = deque(self.goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, nxt in self.goto[node].items():
+                queue.append(nxt)
+                f = self.fail[node]
+                while f and ch not in self.goto[f]:
+                    f = self.fail[f]
+                self.fail[nxt] = self.goto[f].get(ch, 0)
+                self.out[nxt] += self.out[self.fail[nxt]]
+
+    def iter(self, text, start=0, end=None):
+        """
+        找出 `text[start:end]` 中所有詞的位置
+
+        :retrun: 依序產生 (起始, 結束)
+        """
+        if end is None:
+            end = len(text)
+        node = 0
+        for i in range(start, end):
+            ch = text[i]
+            while node and ch not in self.goto[node]:
+                node = self.fail[node]
+            node = self.goto[node].get(ch, 0)
+            for length in self.out[node]:
+                yield i + 1 - length, i + 1
+
+
+class DisableWordIndex():
+    def __init__(self, words):
+        """
+        禁用字索引：`frozenset` 做片段完全比對，多字禁用詞另建 Aho-Corasick 自動機，
+        用於檢查編輯是否落在禁用詞內；查詢成本與詞表大小無關
+
+        :param words: 禁用字詞
+        :type words: Iterable[str]
+        """
+        self.words = frozenset(w for w in words if w)
+        multi_char_words = [w for w in self.words if len(w) > 1]
+        self.max_len = max(map(len, multi_char_words), default=0)
+        self._automaton = _AhoCorasick(multi_char_words) if multi_char_words else None
+
+    @classmethod
+    def from_file(cls, path):
+        """
+        讀取以空白或換行分隔的禁用字檔案
+        """
+        with open(path, "r", encoding="utf-8") as f:
+            return cls(f.read().split())
+
+    def __contains__(self, span):
+        return span in self.words
+
+    def __iter__(self):
+        return iter(self.words)
+
+    def __len__(self):
+        return len(self.words)
+
+    def find_all(self, text, start=0, end=None):
+        """
+        找出 `text[start:end]` 中所有多字禁用詞的位置
+        """
+        if self._automaton is None:
+            return iter(())
+        return self._automaton.iter(text, start, end)
+
+    def touches(self, text, start, end):
+        """
+        `text[start:end]` 的編輯是否落在任一多字禁用詞內；`start == end` 表示在該位置插入
+
+        只掃描編輯位置附近 `max_len` 範圍
+        """
+        if self._automaton is None:
+            return False
+        lo = max(0, start - self.max_len + 1)
+        hi = min(len(text), end + self.max_len - 1)
+        for word_start, word_end in self._automaton.iter(text, lo, hi):
+            if start < end and word_start < end and start < word_end:
+                return True
+            if start == end and word_start < start < word_end:
+                return True
+        return False
+
+
+disable_words_path = os.path.join(
+    os.path.dirname(__file__),
+    "disable_words.txt"
+)
+
+_disable_words_lock = threading.Lock()
+
+
+def get_disable_words():
+    """
+    取得全域禁用字索引，第一次呼叫時才讀取 `disable_words.txt`
+
+    :rtype: DisableWordIndex
+    """
+    global disable_words
+    try:
+        return disable_words
+    except NameError:
+        pass
+    with _disable_words_lock:
+        if 'disable_words' not in globals():
+            disable_words = DisableWordIndex.from_file(disable_words_path)
+        return disable_words
+
+
+def __getattr__(name):
+    if name == 'disable_words':
+        return get_disable_words()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def set_disable_words(words):
+    """
+    替換全域禁用字表，例如加入領域詞彙
+
+    :param words: 禁用字詞或 `DisableWordIndex`
+    """
+    global disable_words
+    if not isinstance(words, DisableWordIndex):
+        words = DisableWordIndex(words)
+    disable_words = words
 
 def is_mistake_happend_on_disable_words(ori_snet,new_snet):
+    import edit_distance
+    disable_words = get_disable_words()
     sm = edit_distance.SequenceMatcher(a=ori_snet, b=new_snet)
     for op_code in sm.get_opcodes():
         operation_name,a_start,a_end,b_start,b_end = op_code
@@ -31,4 +379,32 @@ def is_mistake_happend_on_disable_words(ori_snet,new_snet):
             b_span = new_snet[b_start:b_end]
             if a_span in disable_words or b_span in disable_words:
                 return True
-    return False
\ No newline at end of file
+    return False
+
+def is_mistake_happend_on_disable_span(ori_span,new_span):
+    """
+    已知編輯位置時只比對被替換的片段，去除兩段相同的前後綴後檢查是否為禁用字
+    """
+    prefix = 0
+    while prefix < min(len(ori_span), len(new_span)) and ori_span[prefix] == new_span[prefix]:
+        prefix += 1
+    ori_span, new_span = ori_span[prefix:], new_span[prefix:]
+
+    suffix = 0
+    while suffix < min(len(ori_span), len(new_span)) and ori_span[-1-suffix] == new_span[-1-suffix]:
+        suffix += 1
+    ori_span = ori_span[:len(ori_span)-suffix]
+    new_span = new_span[:len(new_span)-suffix]
+
+    disable_words = get_disable_words()
+    return ori_span in disable_words or new_span in disable_words
+
+def is_mistake_happend_on_disable_edit(ori_snet,new_snet,start,ori_end,new_end):
+    """
+    已知編輯位置 `ori_snet[start:ori_end]` -> `new_snet[start:new_end]` 時的禁用字檢查：
+    片段本身為禁用字，或編輯落在多字禁用詞內
+    """
+    if is_mistake_happend_on_disable_span(ori_snet[start:ori_end], new_snet[start:new_end]):
+        return True
+    disable_words = get_disable_words()
+    return disable_words.touches(ori_snet, start, ori_end) or disable_words.touches(new_snet, start, new_end)
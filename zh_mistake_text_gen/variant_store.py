@@ -0,0 +1,323 @@
+import argparse
+import mmap
+import os
+import shutil
+import struct
+import sys
+import tempfile
+from array import array
+from .confusion_set import _to_le
+from .data_model import NoiseRecord
+from .sampling import current_rng, sample_seed, sample_rng, _numpy
+
+MAGIC = b'ZMVS'
+VERSION = 1
+
+# magic, version, 句子數, 錯誤句總數, 類型名稱位元組數, 正確句位元組數, 錯誤句位元組數
+_HEADER = struct.Struct('<4sIQQQQQ')
+
+# 每個錯誤句的編輯位置：incorrect_start_at, incorrect_end_at, 正確句中的結束位置；未知為 -1
+_POSITIONS = 3
+
+# 暫存陣列累積到此筆數時寫出，建置時記憶體用量與語料大小無關
+_FLUSH_SIZE = 1 << 16
+
+# splitmix64 常數，與 `sample_seed` 相同
+_MASK64 = (1 << 64) - 1
+_GOLDEN = 0x9E3779B97F4A7C15
+_MIX1 = 0xBF58476D1CE4E5B9
+_MIX2 = 0x94D049BB133111EB
+
+
+def _pad(n):
+    return -n % 8
+
+
+class _Section():
+    # 寫入暫存檔的 little-endian 陣列
+    def __init__(self, directory, name, typecode):
+        self.path = os.path.join(directory, name)
+        self._f = open(self.path, 'wb')
+        self._buf = array(typecode)
+        self.size = 0
+
+    def append(self, value):
+        self._buf.append(value)
+        if len(self._buf) >= _FLUSH_SIZE:
+            self.flush()
+
+    def flush(self):
+        self._f.write(_to_le(self._buf).tobytes())
+        self.size += len(self._buf) * self._buf.itemsize
+        del self._buf[:]
+
+    def close(self):
+        self.flush()
+        self._f.close()
+
+
+def _position(value):
+    return -1 if value is None else value
+
+
+def build_variant_store(path, sentences, k=8, pipeline=None, seed=None, verbose=False):
+    """
+    以 `Pipeline.variants` 為每一句預先產生至多 k 個不重複的錯誤句，寫入可 mmap 的二進位檔
+
+    檔案格式：標頭後依序為類型名稱（UTF-8，以換行分隔）、每句第一個錯誤句的序號（uint64）、
+    正確句與錯誤句的位元組 offset（uint64）、類型代碼（uint16）、編輯位置（int32），
+    最後為正確句與錯誤句的 UTF-8 文字；各區段以 8 位元組對齊，數值皆為 little-endian
+
+    :param path: 輸出路徑
+    :param sentences: 可迭代的正確句子，以串流方式讀取
+    :param k: 每句最多幾個錯誤句；編輯空間不足的句子會少於 k 個
+    :param pipeline: Optional `Pipeline` 實例，預設為 `Pipeline()`
+    :param seed: Optional 隨機種子；每一句以 (seed, 句子序號) 推導自己的亂數
+    :param verbose: 除錯或額外訊息
+    :retrun: (句子數, 錯誤句總數)
+    :rtype: tuple[int, int]
+    """
+    if pipeline is None:
+        from .pipeline import Pipeline
+        pipeline = Pipeline()
+
+    type_codes = {}
+    n_sentences = 0
+    n_variants = 0
+    with tempfile.TemporaryDirectory(dir=os.path.dirname(os.path.abspath(path))) as tmp:
+        sentence_offsets = _Section(tmp, 'sentence_offsets', 'Q')
+        correct_offsets = _Section(tmp, 'correct_offsets', 'Q')
+        variant_offsets = _Section(tmp, 'variant_offsets', 'Q')
+        types = _Section(tmp, 'types', 'H')
+        positions = _Section(tmp, 'positions', 'i')
+        sections = (sentence_offsets, correct_offsets, variant_offsets, types, positions)
+        correct_text = open(os.path.join(tmp, 'correct_text'), 'wb')
+        variant_text = open(os.path.join(tmp, 'variant_text'), 'wb')
+        correct_bytes = 0
+        variant_bytes = 0
+
+        sentence_offsets.append(0)
+        correct_offsets.append(0)
+        variant_offsets.append(0)
+        for index, x in enumerate(sentences):
+            rng = None if seed is None else sample_rng(seed, index)
+            records = pipeline.variants(x, k, verbose=verbose, rng=rng, fast_record=True)
+
+            data = x.encode('utf-8')
+            correct_text.write(data)
+            correct_bytes += len(data)
+            correct_offsets.append(correct_bytes)
+            for record in records:
+                data = record.incorrect.encode('utf-8')
+                variant_text.write(data)
+                variant_bytes += len(data)
+                variant_offsets.append(variant_bytes)
+                types.append(type_codes.setdefault(record.type, len(type_codes)))
+                start = record.incorrect_start_at
+                correct_end = None if start is None or record.correct_span is None else start + len(record.correct_span)
+                positions.append(_position(start))
+                positions.append(_position(record.incorrect_end_at))
+                positions.append(_position(correct_end))
+            n_variants += len(records)
+            n_sentences += 1
+            sentence_offsets.append(n_variants)
+
+        for section in sections:
+            section.close()
+        correct_text.close()
+        variant_text.close()
+
+        type_names = '\n'.join(type_codes).encode('utf-8')
+        with open(path, 'wb') as f:
+            f.write(_HEADER.pack(MAGIC, VERSION, n_sentences, n_variants,
+                                 len(type_names), correct_bytes, variant_bytes))
+            f.write(type_names + b'\0' * _pad(len(type_names)))
+            for section in sections:
+                with open(section.path, 'rb') as src:
+                    shutil.copyfileobj(src, f)
+                f.write(b'\0' * _pad(section.size))
+            for name in ('correct_text', 'variant_text'):
+                with open(os.path.join(tmp, name), 'rb') as src:
+                    shutil.copyfileobj(src, f)
+
+    return n_sentences, n_variants
+
+
+def _splitmix_many(np, seed, n):
+    # 向量化的 `sample_seed(seed, index)`，index 為 0..n-1
+    with np.errstate(over='ignore'):
+        z = np.uint64((seed * _GOLDEN) & _MASK64) + np.arange(1, n + 1, dtype=np.uint64) * np.uint64(_MIX1)
+        z = (z ^ (z >> np.uint64(30))) * np.uint64(_MIX1)
+        z = (z ^ (z >> np.uint64(27))) * np.uint64(_MIX2)
+        return z ^ (z >> np.uint64(31))
+
+
+class VariantStore():
+    def __init__(self, path):
+        """
+        以 mmap 載入 `build_variant_store` 產生的檔案；讀取前不建立任何 Python 物件，
+        多進程（例如 DataLoader worker）間共用同一份分頁
+
+        :param path: 檔案路徑
+        """
+        self.path = path
+        self._open()
+
+    def _open(self):
+        with open(self.path, 'rb') as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        (magic, version, self.n_sentences, self.n_variants,
+         types_bytes, correct_bytes, variant_bytes) = _HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{self.path} is not a variant store file")
+
+        pos = _HEADER.size
+        names = self._mm[pos:pos + types_bytes].decode('utf-8')
+        self.types = tuple(names.split('\n')) if names else ()
+        pos += types_bytes + _pad(types_bytes)
+
+        self._arrays = {}
+        for name, typecode, count in (
+            ('sentence_offsets', 'Q', self.n_sentences + 1),
+            ('correct_offsets', 'Q', self.n_sentences + 1),
+            ('variant_offsets', 'Q', self.n_variants + 1),
+            ('types', 'H', self.n_variants),
+            ('positions', 'i', self.n_variants * _POSITIONS),
+        ):
+            size = array(typecode).itemsize * count
+            self._arrays[name] = (pos, typecode, count)
+            view = memoryview(self._mm)[pos:pos + size]
+            if sys.byteorder == 'big':
+                view = _to_le(array(typecode, view.tobytes()))
+            else:
+                view = view.cast(typecode)
+            setattr(self, '_' + name, view)
+            pos += size + _pad(size)
+
+        self._correct_pos = pos
+        self._variant_pos = pos + correct_bytes
+
+    def __getstate__(self):
+        return {'path': self.path}
+
+    def __setstate__(self, state):
+        self.path = state['path']
+        self._open()
+
+    def __len__(self):
+        return self.n_sentences
+
+    def num_variants(self, i):
+        """
+        第 i 句的錯誤句數量
+        """
+        return self._sentence_offsets[i + 1] - self._sentence_offsets[i]
+
+    def correct(self, i):
+        """
+        第 i 句的正確句
+        """
+        start = self._correct_pos + self._correct_offsets[i]
+        end = self._correct_pos + self._correct_offsets[i + 1]
+        return self._mm[start:end].decode('utf-8')
+
+    def record(self, i, v, fast_record=False):
+        """
+        讀取第 i 句、全域序號為 v 的錯誤句
+
+        :param i: 句子序號
+        :param v: 錯誤句的全域序號，介於 `sentence_offsets[i]` 與 `sentence_offsets[i + 1]` 之間
+        :param fast_record: Optional 回傳 `NoiseRecord` 而非 `NoiseCorpus`
+        """
+        correct = self.correct(i)
+        start = self._variant_pos + self._variant_offsets[v]
+        end = self._variant_pos + self._variant_offsets[v + 1]
+        incorrect = self._mm[start:end].decode('utf-8')
+        start, end, correct_end = self._positions[v * _POSITIONS:(v + 1) * _POSITIONS]
+        record = NoiseRecord(correct=correct, incorrect=incorrect, type=self.types[self._types[v]])
+        if start >= 0:
+            record.incorrect_start_at = start
+            record.incorrect_end_at = end
+            record.span = incorrect[start:end]
+            record.correct_span = correct[start:correct_end]
+        if fast_record:
+            return record
+        return record.to_model()
+
+    def variant(self, i, j, fast_record=False):
+        """
+        第 i 句的第 j 個錯誤句
+        """
+        if not 0 <= j < self.num_variants(i):
+            raise IndexError(f"sentence {i} has {self.num_variants(i)} variants")
+        return self.record(i, self._sentence_offsets[i] + j, fast_record)
+
+    def sample(self, i, rng=None, fast_record=False):
+        """
+        隨機取第 i 句的一個錯誤句；沒有錯誤句時回傳 `None`
+
+        :param rng: Optional `random.Random`，預設為 `current_rng()`
+        """
+        n = self.num_variants(i)
+        if n == 0:
+            return None
+        rng = current_rng() if rng is None else rng
+        return self.record(i, self._sentence_offsets[i] + rng.randrange(n), fast_record)
+
+    def epoch_indices(self, epoch, seed=None):
+        """
+        為每一句抽出本 epoch 使用的錯誤句全域序號，以 (seed, epoch, 句子序號) 決定，沒有錯誤句的句子為 -1；
+        安裝 NumPy 時直接在 mmap 上向量化計算，回傳 `numpy.ndarray`，否則回傳 list
+
+        :param epoch: epoch 序號
+        :param seed: Optional 隨機種子，未設定時每次呼叫結果不同
+        """
+        if seed is None:
+            seed = int.from_bytes(os.urandom(8), 'little')
+        epoch_seed = sample_seed(seed, epoch)
+        n = self.n_sentences
+
+        np = _numpy()
+        if np is None:
+            offsets = self._sentence_offsets
+            out = []
+            for i in range(n):
+                count = offsets[i + 1] - offsets[i]
+                out.append(offsets[i] + sample_seed(epoch_seed, i) % count if count else -1)
+            return out
+
+        pos, _, count = self._arrays['sentence_offsets']
+        offsets = np.frombuffer(self._mm, dtype='<u8', count=count, offset=pos)
+        counts = offsets[1:] - offsets[:-1]
+        chosen = offsets[:-1] + _splitmix_many(np, epoch_seed, n) % np.maximum(counts, np.uint64(1))
+        return np.where(counts > 0, chosen.astype(np.int64), -1)
+
+    def iter_epoch(self, epoch, seed=None, fast_record=False):
+        """
+        依句子順序產出本 epoch 每一句的錯誤句，略過沒有錯誤句的句子；參數同 `epoch_indices`
+        """
+        for i, v in enumerate(self.epoch_indices(epoch, seed)):
+            if v >= 0:
+                yield self.record(i, int(v), fast_record)
+
+
+def main(argv=None):
+    from .cli import read_sentences
+
+    parser = argparse.ArgumentParser(
+        prog='python -m zh_mistake_text_gen.variant_store',
+        description='預先為每一句產生多個錯誤句，輸出可 mmap 的檔案'
+    )
+    parser.add_argument('input', help='輸入檔案，一行一句')
+    parser.add_argument('output', help='輸出檔案')
+    parser.add_argument('-k', type=int, default=8, help='每句最多幾個錯誤句')
+    parser.add_argument('--seed', type=int, default=None, help='隨機種子')
+    args = parser.parse_args(argv)
+
+    with open(args.input, encoding='utf-8') as f:
+        build_variant_store(args.output, read_sentences(f, 'text', None), k=args.k, seed=args.seed)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,94 @@
+from .data_model import NOISE_CORPUS_FIELDS
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover
+    pa = None
+    pq = None
+
+_INT_FIELDS = ('incorrect_start_at', 'incorrect_end_at')
+
+
+def _schema():
+    return pa.schema([
+        pa.field(name, pa.int32() if name in _INT_FIELDS else pa.string())
+        for name in NOISE_CORPUS_FIELDS
+    ])
+
+
+class ColumnarWriter():
+    def __init__(self, path, format=None, batch_size=65536, compression='zstd'):
+        """
+        將 `NoiseCorpus`/`NoiseRecord` 緩衝成欄式批次，寫出 Parquet 或 Arrow IPC 檔案
+
+        需要安裝 `pyarrow`
+
+        :param path: 輸出路徑
+        :param format: Optional `parquet` 或 `arrow`，預設依副檔名判斷（`.arrow`/`.feather` 為 arrow）
+        :param batch_size: 每累積多少筆寫出一個批次（Parquet row group）
+        :param compression: Parquet 壓縮方式
+        """
+        if pa is None:
+            raise ImportError(
+                'pyarrow is required for columnar output, install with `pip install zh-mistake-text-gen[arrow]`')
+
+        if format is None:
+            format = 'arrow' if str(path).endswith(('.arrow', '.feather')) else 'parquet'
+        if format not in ('parquet', 'arrow'):
+            raise ValueError(f"unknown format `{format}`")
+
+        self.path = path
+        self.format = format
+        self.batch_size = batch_size
+        self.schema = _schema()
+        self._columns = {name: [] for name in NOISE_CORPUS_FIELDS}
+        self._num_buffered = 0
+
+        if format == 'parquet':
+            self._writer = pq.ParquetWriter(path, self.schema, compression=compression)
+        else:
+            self._sink = pa.OSFile(str(path), 'wb')
+            self._writer = pa.ipc.new_file(self._sink, self.schema)
+
+    def write(self, record):
+        """
+        寫入一筆資料
+        """
+        for name, column in self._columns.items():
+            column.append(getattr(record, name))
+        self._num_buffered += 1
+        if self._num_buffered >= self.batch_size:
+            self.flush()
+
+    def write_many(self, records):
+        for record in records:
+            self.write(record)
+
+    def flush(self):
+        """
+        將緩衝中的資料寫出為一個批次
+        """
+        if self._num_buffered == 0:
+            return
+        batch = pa.RecordBatch.from_arrays(
+            [pa.array(self._columns[name], type=field.type)
+             for name, field in zip(NOISE_CORPUS_FIELDS, self.schema)],
+            schema=self.schema
+        )
+        self._writer.write_batch(batch)
+        for column in self._columns.values():
+            column.clear()
+        self._num_buffered = 0
+
+    def close(self):
+        self.flush()
+        self._writer.close()
+        if self.format == 'arrow':
+            self._sink.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()